@@ -2,49 +2,143 @@
 AI Interviewer Agent using Azure OpenAI
 Provides contextual help, hints, and maintains conversation
 """
-from typing import Dict, Any, List, AsyncGenerator
-from datetime import datetime
+import hashlib
+import json
+import os
+import re
+import time
+
+import orjson
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Optional, AsyncGenerator
+import httpx
 from openai import AsyncAzureOpenAI, AsyncOpenAI
 from app.config import settings
+from app.services.semantic_cache import get_semantic_cache
+from app.services.llm_batcher import get_llm_batcher
+from app.services.response_cache import get_response_cache
+
+# Semantic-cache embeddings latch off after this many consecutive
+# failures, so a misconfigured (or absent) embedding deployment doesn't
+# cost every turn a doomed round trip before the real request
+_EMBED_MAX_FAILURES = 3
+_embed_failures = 0
+
+# Budget for code embedded in prompts (~800 tokens at ~4 chars/token).
+# Keeps a pasted 10 KB file from inflating prefill cost on every turn.
+MAX_CODE_CHARS = 3200
+
+# Streaming coalescer: flush buffered deltas once either limit is reached,
+# so we emit a handful of frames instead of one per provider token
+STREAM_FLUSH_CHARS = 32
+STREAM_FLUSH_SECONDS = 0.025
+
+# Markdown fence stripper: one compiled-regex scan instead of chained
+# `in`/`split` passes, for providers that ignore response_format and wrap
+# their JSON in ``` fences anyway
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+# Mock-response keyword sets: tokenize the message once and intersect,
+# instead of re-walking the string per keyword under fallback storms
+_WORD_RE = re.compile(r"[a-z]+")
+_HINT_KWS = frozenset({"hint", "stuck", "help"})
+_SOLUTION_KWS = frozenset({"solution", "code"})
+_CONNECTION_KWS = frozenset({"connection", "why"})
+
+
+@lru_cache(maxsize=1)
+def _get_shared_client() -> Tuple[Any, str, bool]:
+    """
+    Build the OpenAI/Azure/Ollama client once per process.
+
+    Every InterviewerAgent used to construct its own AsyncOpenAI client (and
+    with it a fresh httpx pool + TLS handshakes). Sharing one client across
+    sessions amortizes connection setup and avoids leaking sockets under
+    concurrent interviews.
+
+    Returns (client, deployment, is_local_llm).
+    """
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
+
+    if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
+        print(" Using Azure OpenAI")
+        client = AsyncAzureOpenAI(
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            api_version=settings.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+            http_client=http_client
+        )
+        return client, settings.AZURE_OPENAI_DEPLOYMENT, False
+
+    if settings.USE_LOCAL_LLM:
+        print(f" Using Local LLM (Ollama): {settings.OLLAMA_MODEL}")
+        client = AsyncOpenAI(
+            base_url=settings.OLLAMA_BASE_URL,
+            api_key="ollama",  # Required but ignored
+            http_client=http_client
+        )
+        return client, settings.OLLAMA_MODEL, True
+
+    print(" Using Standard OpenAI")
+    if not settings.OPENAI_API_KEY:
+        print("⚠️ WARNING: No OPENAI_API_KEY found in settings!")
+
+    client = AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=http_client
+    )
+    # Use gpt-3.5-turbo (accessible to all)
+    return client, "gpt-3.5-turbo", False
+
+
+async def _embed_cache_text(key_text: str) -> Optional[List[float]]:
+    """
+    Embed a semantic-cache key via the shared client.
+    Returns None whenever the cache should be bypassed: no EMBEDDING_MODEL
+    configured, or embeddings latched off after repeated failures.
+    """
+    global _embed_failures
+    if not settings.EMBEDDING_MODEL or _embed_failures >= _EMBED_MAX_FAILURES:
+        return None
+    client, _, _ = _get_shared_client()
+    try:
+        result = await client.embeddings.create(
+            model=settings.EMBEDDING_MODEL,
+            input=[key_text]
+        )
+    except Exception as e:
+        _embed_failures += 1
+        if _embed_failures >= _EMBED_MAX_FAILURES:
+            print(f"Semantic cache embedding failed {_embed_failures} times, disabling: {e}")
+        else:
+            print(f"Semantic cache embedding error (bypassing cache): {e}")
+        return None
+    _embed_failures = 0
+    return result.data[0].embedding
+
 
 class InterviewerAgent:
     """
     AI Interviewer that helps candidates during coding interviews
     Uses Azure OpenAI or Standard OpenAI for natural language understanding
     """
-    
+
+    # Memoized (key, messages) for each session's most recent turn.
+    # Class-level because agents are constructed per socket event, so an
+    # instance attribute would reset every turn and never hit. Bounded so
+    # long-lived processes don't accumulate entries for dead sessions.
+    _session_last_messages: Dict[str, Tuple[bytes, List[Dict[str, str]]]] = {}
+    _MEMO_MAX_SESSIONS = 1000
+
     def __init__(self, session_id: str):
         self.session_id = session_id
-        
-        # Check if we should use Azure, Local LLM, or Standard OpenAI
-        if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
-            print(" Using Azure OpenAI")
-            self.client = AsyncAzureOpenAI(
-                api_key=settings.AZURE_OPENAI_API_KEY,
-                api_version=settings.AZURE_OPENAI_API_VERSION,
-                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-            )
-            self.deployment = settings.AZURE_OPENAI_DEPLOYMENT
-            
-        elif settings.USE_LOCAL_LLM:
-            print(f" Using Local LLM (Ollama): {settings.OLLAMA_MODEL}")
-            self.client = AsyncOpenAI(
-                base_url=settings.OLLAMA_BASE_URL,
-                api_key="ollama" # Required but ignored
-            )
-            self.deployment = settings.OLLAMA_MODEL
-            
-        else:
-            print(" Using Standard OpenAI")
-            if not settings.OPENAI_API_KEY:
-                print("⚠️ WARNING: No OPENAI_API_KEY found in settings!")
-                
-            self.client = AsyncOpenAI(
-                api_key=settings.OPENAI_API_KEY
-            )
-            # Use gpt-3.5-turbo (accessible to all)
-            self.deployment = "gpt-3.5-turbo"
-        
+
+        # Shared process-wide client (Azure, Local LLM, or Standard OpenAI)
+        self.client, self.deployment, self.is_local_llm = _get_shared_client()
+
         # System prompt for the interviewer
         self.system_prompt = """You are a Senior Technical Interviewer and Subject Matter Expert (SME) conducting a live coding interview.
 
@@ -66,13 +160,96 @@ Your Goal: Assess the candidate's problem-solving skills while providing a suppo
 - Do NOT read code character-by-character. Instead say: "I see your code using a loop..."
 - Keep responses concise (1-3 sentences) when in a back-and-forth dialogue.
 """
-    
+
+        # Stable hash of the system prompt - part of the semantic cache key so
+        # cached responses are invalidated whenever the persona changes
+        self._system_prompt_hash = hashlib.sha256(self.system_prompt.encode()).hexdigest()[:16]
+
+        # Byte-identical system message reused on every request so the
+        # provider's automatic prefix/KV cache hits. Never interpolate
+        # anything dynamic (timestamps, session state) into this message.
+        self._system_msg = {"role": "system", "content": self.system_prompt}
+
+        # Provider-side caching hints passed via extra_body on each call:
+        # - OpenAI/Azure: prompt_cache_key routes repeat prefixes to the same
+        #   cache shard so prefill for the shared system prompt is skipped
+        # - Ollama: keep_alive keeps the model (and its KV cache) resident
+        if self.is_local_llm:
+            self._extra_body = {
+                "keep_alive": "30m",
+                # Tune llama.cpp for this workload: bounded context window,
+                # generation capped to our max_completion_tokens, all cores
+                "options": {
+                    "num_ctx": 4096,
+                    "num_predict": 500,
+                    "num_thread": os.cpu_count()
+                }
+            }
+        elif (settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT
+                and settings.AZURE_OPENAI_API_VERSION < "2024-10-01"):
+            # Same gate as the SK agent: older Azure api-versions reject
+            # unknown body parameters with a 400, which would drop every
+            # call into the mock fallback just to send a cache hint
+            self._extra_body = {}
+        else:
+            self._extra_body = {"prompt_cache_key": f"interviewer-v1-{self.session_id}"}
+
+    async def _embed_cache_key(self, user_message: str, context: Dict[str, Any]) -> Optional[List[float]]:
+        """
+        Embed (system_prompt_hash, problem_id, user_message) for the semantic cache.
+        Returns None when caching is disabled or the embedding call fails.
+        """
+        key_text = f"{self._system_prompt_hash}|{self._cache_problem_id(context)}|{user_message}"
+        return await _embed_cache_text(key_text)
+
+    def _cache_problem_id(self, context: Dict[str, Any]) -> str:
+        """Problem identifier used to scope semantic cache entries"""
+        return str(context.get('problem_id') or context.get('problem_title') or "")
+
+    def _build_messages(self, user_message: str, context: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Build (and memoize) the messages list for a turn.
+        Two rapid calls with an unchanged code buffer reuse the exact same
+        list, skipping the prompt re-assembly and keeping the request
+        byte-identical for the provider's prefix cache.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        for part in (
+            user_message,
+            context.get('current_code') or '',
+            str(context.get('problem_title') or ''),
+            str(context.get('recent_errors') or '')
+        ):
+            h.update(part.encode())
+            h.update(b'\x00')
+        key = h.digest()
+
+        memo = self._session_last_messages.get(self.session_id)
+        if memo is not None and memo[0] == key:
+            return memo[1]
+
+        messages = [
+            self._system_msg,
+            {"role": "user", "content": self._build_prompt(user_message, context)}
+        ]
+        if (self.session_id not in self._session_last_messages
+                and len(self._session_last_messages) >= self._MEMO_MAX_SESSIONS):
+            # FIFO eviction: dicts preserve insertion order
+            self._session_last_messages.pop(next(iter(self._session_last_messages)))
+        self._session_last_messages[self.session_id] = (key, messages)
+        return messages
+
     def _build_prompt(self, user_message: str, context: Dict[str, Any]) -> str:
         """Helper to construct the prompt with context"""
         prompt = f"Candidate says: {user_message}\n\nContext:\n"
         
         if context.get('current_code'):
-            prompt += f"Current Code:\n```javascript\n{context['current_code']}\n```\n"
+            code = context['current_code']
+            if len(code) > MAX_CODE_CHARS:
+                # Keep the most recent portion - the tail is what the
+                # candidate is actively editing - and mark the elision
+                code = "// …earlier code truncated…\n" + code[-MAX_CODE_CHARS:]
+            prompt += f"Current Code:\n```javascript\n{code}\n```\n"
             
         if context.get('recent_errors'):
             prompt += f"Recent Execution Error: {context['recent_errors']}\n"
@@ -87,26 +264,58 @@ Your Goal: Assess the candidate's problem-solving skills while providing a suppo
         Send message to AI and yield streaming chunks
         """
         try:
-            # Build context-aware prompt
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": self._build_prompt(user_message, context)}
-            ]
-            
+            # Semantic cache: replay stored completion for near-identical prompts
+            cache = get_semantic_cache()
+            embedding = await self._embed_cache_key(user_message, context)
+            if embedding is not None:
+                cached = cache.lookup(embedding, self._cache_problem_id(context))
+                if cached:
+                    async for chunk in cache.replay(cached):
+                        yield chunk
+                    return
+
+            # Build context-aware prompt (shared system prefix always first)
+            messages = self._build_messages(user_message, context)
+
             print(f"DEBUG: Streaming request to {self.deployment}...")
             stream = await self.client.chat.completions.create(
                 model=self.deployment,
                 messages=messages,
                 temperature=0.7,
                 max_completion_tokens=500,
-                stream=True  # Enable streaming
+                stream=True,  # Enable streaming
+                extra_body=self._extra_body
             )
-            
+
+            full_response = []
+
+            # Coalesce tiny provider deltas before yielding
+            buf = []
+            buf_len = 0
+            last_flush = time.monotonic()
+
             async for chunk in stream:
                 if chunk.choices and len(chunk.choices) > 0:
                     delta = chunk.choices[0].delta
                     if delta.content is not None:
-                        yield delta.content
+                        full_response.append(delta.content)
+                        buf.append(delta.content)
+                        buf_len += len(delta.content)
+
+                        now = time.monotonic()
+                        if buf_len >= STREAM_FLUSH_CHARS or (now - last_flush) >= STREAM_FLUSH_SECONDS:
+                            yield ''.join(buf)
+                            buf.clear()
+                            buf_len = 0
+                            last_flush = now
+
+            # Flush whatever is left when the stream ends
+            if buf:
+                yield ''.join(buf)
+
+            # Store the complete response for future near-identical prompts
+            if embedding is not None and full_response:
+                cache.store(embedding, self._cache_problem_id(context), ''.join(full_response))
         except Exception as e:
             print(f"AI Stream Error ({type(e).__name__}): {str(e)}")
             # Fallback to Mock Response (sent as a single chunk)
@@ -123,20 +332,32 @@ Your Goal: Assess the candidate's problem-solving skills while providing a suppo
         Falls back to Mock AI if connection fails
         """
         try:
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": self._build_prompt(user_message, context)}
-            ]
-            
-            response = await self.client.chat.completions.create(
+            # Semantic cache: return stored completion for near-identical prompts
+            cache = get_semantic_cache()
+            embedding = await self._embed_cache_key(user_message, context)
+            if embedding is not None:
+                cached = cache.lookup(embedding, self._cache_problem_id(context))
+                if cached:
+                    return cached
+
+            messages = self._build_messages(user_message, context)
+
+            # Route through the shared micro-batcher so concurrent sessions
+            # dispatch in one parallel window
+            response = await get_llm_batcher().submit(self.client, dict(
                 model=self.deployment,
                 messages=messages,
                 temperature=0.7,
-                max_completion_tokens=500
-            )
-            
-            return response.choices[0].message.content
-            
+                max_completion_tokens=500,
+                extra_body=self._extra_body
+            ))
+
+            content = response.choices[0].message.content
+            if embedding is not None and content:
+                cache.store(embedding, self._cache_problem_id(context), content)
+
+            return content
+
         except Exception as e:
             print(f"AI Agent error: {str(e)}")
             # Graceful Fallback (Mock AI)
@@ -146,20 +367,20 @@ Your Goal: Assess the candidate's problem-solving skills while providing a suppo
         """
         Provide a simulated response when AI is offline
         """
-        msg = user_message.lower()
-        
+        words = frozenset(_WORD_RE.findall(user_message.lower()))
+
         # 1. Hint Request
-        if "hint" in msg or "stuck" in msg or "help" in msg:
+        if words & _HINT_KWS:
             if context.get('recent_errors'):
                 return f"I see you're encountering an error: `{context['recent_errors']}`. \n\n**Hint:** Try checking your logic around that line. Usually, this happens when you access an index out of bounds or mistype a variable name."
             return "Sure! **Hint:** For the Two Sum problem, consider using a Hash Map (Object in JS) to store numbers you've already seen. This allows you to look up the complement in O(1) time."
-            
+
         # 2. Solution/Code related
-        if "solution" in msg or "code" in msg:
+        if words & _SOLUTION_KWS:
             return "I'd love to help, but I can't write the code for you! Try starting with a loop to iterate through the array. What would you do inside the loop?"
-            
+
         # 3. Connection Error Explanation
-        if "connection" in msg or "why" in msg:
+        if words & _CONNECTION_KWS:
             return f"I'm operating in **Offline Mode** right now because I couldn't connect to the AI model. \n*(Error: {error})*\n\nPlease make sure Ollama is running (`ollama run llama3.2`) or your API keys are set in `.env`."
             
         # 4. Default Chat functionality
@@ -168,25 +389,36 @@ Your Goal: Assess the candidate's problem-solving skills while providing a suppo
     async def proactive_hint(self, context: Dict[str, Any]) -> str:
         """
         Generate a proactive hint when the candidate is stuck
+        """
+        hint_prompt = f"""The candidate appears to be stuck. They've hit the same error {context.get('consecutive_errors', 0)} times:
+
+Error: {context.get('error', 'Unknown')}
+
+Their current code:
+```javascript
+{context.get('code', '')}
+```
+
 Provide a brief, helpful hint (2-3 sentences) that guides them toward fixing the issue WITHOUT giving away the solution. Focus on:
 1. What might be causing the error
 2. A general approach to fix it
 3. Encouragement
 
 Keep it concise and supportive!"""
-        
+
         messages = [
-            {"role": "system", "content": self.system_prompt},
+            self._system_msg,
             {"role": "user", "content": hint_prompt}
         ]
-        
+
         try:
-            response = await self.client.chat.completions.create(
+            response = await get_llm_batcher().submit(self.client, dict(
                 model=self.deployment,
                 messages=messages,
                 temperature=0.7,
-                max_completion_tokens=200
-            )
+                max_completion_tokens=200,
+                extra_body=self._extra_body
+            ))
             
             return response.choices[0].message.content
             
@@ -197,37 +429,81 @@ Keep it concise and supportive!"""
     async def analyze_code(self, code: str, problem_id: str) -> Dict[str, Any]:
         """
         Analyze the final code submission for the report
+        Streams the JSON response and parses incrementally, so the result is
+        returned as soon as the object closes instead of buffering the full
+        600-token completion first
+        """
+        analysis_prompt = f"""Analyze this code submission for the "{problem_id}" problem:
+
+```javascript
+{code}
+```
+
+Provide:
+1. **Time Complexity**: Big-O of the solution
+2. **Space Complexity**: Big-O of extra memory used
 3. **Code Quality Score**: Rate 1-10 based on readability, correctness, and efficiency
 4. **Strengths**: 2-3 positive aspects of the solution
 5. **Areas for Improvement**: 2-3 constructive suggestions
 
 Format your response as JSON with keys: time_complexity, space_complexity, quality_score, strengths (array), improvements (array)"""
-        
+
         messages = [
             {"role": "system", "content": "You are a technical interviewer analyzing code submissions."},
             {"role": "user", "content": analysis_prompt}
         ]
-        
+
+        # At temperature 0.3 the analysis is near-deterministic: identical
+        # problem+code submissions can be served from the on-disk cache
+        response_cache = get_response_cache()
+        cache_key = response_cache.make_key(self.deployment, 0.3, messages)
+        cached = response_cache.get(cache_key)
+        if cached:
+            try:
+                return orjson.loads(cached)
+            except orjson.JSONDecodeError:
+                pass
+
         try:
-            response = await self.client.chat.completions.create(
+            # response_format=json_object guarantees raw JSON (no markdown
+            # fences), and streaming lets us stop as soon as it parses
+            stream = await self.client.chat.completions.create(
                 model=self.deployment,
                 messages=messages,
                 temperature=0.3,  # Lower temperature for more consistent analysis
-                max_completion_tokens=600
+                max_completion_tokens=600,
+                stream=True,
+                response_format={"type": "json_object"},
+                extra_body=self._extra_body
             )
-            
-            # Try to parse JSON response
-            import json
-            content = response.choices[0].message.content
-            
-            # Extract JSON from markdown code blocks if present
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            return json.loads(content)
-            
+
+            buffer = ""
+            async for chunk in stream:
+                if chunk.choices and len(chunk.choices) > 0:
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        buffer += delta.content
+                        # Attempt a parse each time the object may have closed
+                        if buffer.rstrip().endswith("}"):
+                            try:
+                                result = orjson.loads(buffer)
+                            except orjson.JSONDecodeError:
+                                pass
+                            else:
+                                # Release the HTTP response before bailing
+                                # out of the stream early, or the pooled
+                                # connection leaks
+                                await stream.close()
+                                response_cache.set(cache_key, orjson.dumps(result).decode())
+                                return result
+
+            # Final parse, stripping markdown fences if the provider added any
+            m = _FENCE_RE.search(buffer)
+            content = m.group(1).strip() if m else buffer.strip()
+            result = orjson.loads(content)
+            response_cache.set(cache_key, orjson.dumps(result).decode())
+            return result
+
         except Exception as e:
             print(f"Code analysis error: {str(e)}")
             # Return default analysis
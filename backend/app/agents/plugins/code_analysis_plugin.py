@@ -2,10 +2,46 @@
 Code Analysis Plugin for Semantic Kernel
 Provides deep code analysis capabilities for the AI interviewer
 """
-from typing import Annotated
+from typing import Annotated, Any, Dict, Optional, Tuple
+import asyncio
 import re
 from semantic_kernel.functions import kernel_function
 
+# Precompiled patterns - compiling once at import avoids the per-call
+# pattern parse/cache lookup inside the re module on every analysis
+_FUNC_PATTERNS = [
+    re.compile(r'function\s+(\w+)\s*\('),  # function name()
+    re.compile(r'const\s+(\w+)\s*=\s*\(.*\)\s*=>'),  # const name = () =>
+    re.compile(r'const\s+(\w+)\s*=\s*function'),  # const name = function
+]
+_FOR_RE = re.compile(r'for\s*\(')
+_WHILE_RE = re.compile(r'while\s*\(')
+_IF_RE = re.compile(r'if\s*\(')
+_NESTED_LOOP_RE = re.compile(r'for.*\{[^}]*for|while.*\{[^}]*while', re.DOTALL)
+_NESTED_FOR_RE = re.compile(r'for.*for', re.DOTALL)
+_FUNC_NAME_RE = re.compile(r'function\s+(\w+)')
+
+# Keywords detected in a single linear scan instead of ~15 separate
+# `substring in code` walks. Sorted longest-first so '===' wins over '=='
+# and '.forEach' over 'for'.
+_KEYWORDS = tuple(sorted((
+    'console.log', '.forEach', 'new Map', 'new Set', '.reduce(', '.sort(',
+    '.map', 'var ', '===', '==', 'while', 'for', '{}', 'Map', 'Object',
+), key=len, reverse=True))
+_KEYWORD_RE = re.compile('|'.join(re.escape(kw) for kw in _KEYWORDS))
+
+# Edge-case markers, likewise collected in one pass each
+_EDGE_RE = re.compile('|'.join(re.escape(kw) for kw in (
+    'length === 0', 'length == 0', 'length === 1', 'length == 1',
+    '!nums', 'nums.length < ', '< 0', 'Set', 'seen',
+)))
+_EDGE_CI_RE = re.compile(r'negative|duplicate', re.IGNORECASE)
+
+
+def _scan_keywords(code: str) -> set:
+    """One pass over the source returning the set of keywords present"""
+    return set(_KEYWORD_RE.findall(code))
+
 
 class CodeAnalysisPlugin:
     """
@@ -13,79 +49,112 @@ class CodeAnalysisPlugin:
     Analyzes JavaScript code for patterns, complexity, and potential issues.
     """
 
+    def __init__(self):
+        # Most recent (code, features) pair - when the interviewer asks for
+        # the full report, structure/complexity/edge-case calls arrive
+        # back-to-back on the same submission and share one scan
+        self._scan_cache: Optional[Tuple[str, Dict[str, Any]]] = None
+
+    def _scan(self, code: str) -> Dict[str, Any]:
+        """
+        Single fused scan feeding all three analysis functions.
+        Extracts every counter and keyword flag in one traversal set and
+        caches the result for the current submission.
+        """
+        # Snapshot the slot once: this runs on to_thread workers and the
+        # plugin instance is shared process-wide, so reading the attribute
+        # piecemeal could interleave with another session's cache write and
+        # hand back features for different code
+        cached = self._scan_cache
+        if cached is not None and cached[0] == code:
+            return cached[1]
+
+        functions = []
+        for pattern in _FUNC_PATTERNS:
+            functions.extend(pattern.findall(code))
+
+        features = {
+            "found": _scan_keywords(code),
+            "edge_found": set(_EDGE_RE.findall(code)),
+            "edge_ci_found": {m.lower() for m in _EDGE_CI_RE.findall(code)},
+            "functions": functions,
+            "for_count": len(_FOR_RE.findall(code)),
+            "while_count": len(_WHILE_RE.findall(code)),
+            "if_count": len(_IF_RE.findall(code)),
+            "nested_loops": bool(_NESTED_LOOP_RE.search(code)),
+            "nested_for": len(_NESTED_FOR_RE.findall(code)),
+            "func_names": _FUNC_NAME_RE.findall(code),
+        }
+
+        self._scan_cache = (code, features)
+        return features
+
     @kernel_function(
         description="Analyze code structure, complexity, and identify potential bugs or issues",
         name="analyze_code_structure"
     )
-    def analyze_code_structure(
+    async def analyze_code_structure(
         self,
         code: Annotated[str, "The JavaScript source code to analyze"]
     ) -> Annotated[str, "Structured analysis of the code"]:
         """Performs structural analysis of the code"""
-        
+        # CPU-bound regex work runs in a worker thread so it never stalls
+        # the event loop (and with it every other streaming interview)
+        return await asyncio.to_thread(self._analyze_code_structure_sync, code)
+
+    def _analyze_code_structure_sync(self, code: str) -> str:
         if not code or code.strip() == "":
             return "No code provided to analyze."
-        
+
+        features = self._scan(code)
+        found = features["found"]
+
         analysis = {
             "lines_of_code": len(code.strip().split('\n')),
-            "functions_detected": [],
+            "functions_detected": features["functions"],
             "loops_detected": [],
             "conditionals_detected": [],
             "potential_issues": [],
             "patterns_used": []
         }
-        
-        # Detect function declarations
-        func_patterns = [
-            r'function\s+(\w+)\s*\(',  # function name()
-            r'const\s+(\w+)\s*=\s*\(.*\)\s*=>',  # const name = () =>
-            r'const\s+(\w+)\s*=\s*function',  # const name = function
-        ]
-        for pattern in func_patterns:
-            matches = re.findall(pattern, code)
-            analysis["functions_detected"].extend(matches)
-        
+
         # Detect loops
-        if 'for' in code:
-            for_matches = re.findall(r'for\s*\(', code)
-            analysis["loops_detected"].append(f"for loops: {len(for_matches)}")
-        if 'while' in code:
-            while_matches = re.findall(r'while\s*\(', code)
-            analysis["loops_detected"].append(f"while loops: {len(while_matches)}")
-        if '.forEach' in code:
+        if 'for' in found:
+            analysis["loops_detected"].append(f"for loops: {features['for_count']}")
+        if 'while' in found:
+            analysis["loops_detected"].append(f"while loops: {features['while_count']}")
+        if '.forEach' in found:
             analysis["loops_detected"].append("forEach used")
-        if '.map' in code:
+        if '.map' in found:
             analysis["loops_detected"].append("map used")
             analysis["patterns_used"].append("Functional programming (map)")
-        
+
         # Detect conditionals
-        if_matches = re.findall(r'if\s*\(', code)
-        if if_matches:
-            analysis["conditionals_detected"].append(f"if statements: {len(if_matches)}")
-        
+        if features["if_count"]:
+            analysis["conditionals_detected"].append(f"if statements: {features['if_count']}")
+
         # Detect common patterns
-        if 'new Map' in code or '{}' in code:
+        if 'new Map' in found or '{}' in found:
             analysis["patterns_used"].append("Hash Map / Object for lookup")
-        if '.sort(' in code:
+        if '.sort(' in found:
             analysis["patterns_used"].append("Sorting")
-        if 'new Set' in code:
+        if 'new Set' in found:
             analysis["patterns_used"].append("Set for uniqueness")
-        if '.reduce(' in code:
+        if '.reduce(' in found:
             analysis["patterns_used"].append("Reduce for aggregation")
-        
+
         # Detect potential issues
-        if 'var ' in code:
+        if 'var ' in found:
             analysis["potential_issues"].append("Uses 'var' - consider 'let' or 'const'")
-        if '==' in code and '===' not in code:
+        if '==' in found and '===' not in found:
             analysis["potential_issues"].append("Uses loose equality '==' - consider strict '==='")
-        if 'console.log' in code:
+        if 'console.log' in found:
             analysis["potential_issues"].append("Contains console.log - may want to remove for production")
-        
+
         # Check for nested loops (O(n²) potential)
-        nested_loop_pattern = r'for.*\{[^}]*for|while.*\{[^}]*while'
-        if re.search(nested_loop_pattern, code, re.DOTALL):
+        if features["nested_loops"]:
             analysis["potential_issues"].append("Nested loops detected - O(n²) time complexity possible")
-        
+
         # Build response
         response = f"""
 **Code Analysis Report**
@@ -102,45 +171,49 @@ class CodeAnalysisPlugin:
         description="Estimate the time and space complexity of the code",
         name="estimate_complexity"
     )
-    def estimate_complexity(
+    async def estimate_complexity(
         self,
         code: Annotated[str, "The source code to analyze"],
         problem_type: Annotated[str, "The type of problem (e.g., 'array search', 'sorting', 'graph')"]
     ) -> Annotated[str, "Complexity estimation"]:
         """Estimates Big-O complexity based on code patterns"""
-        
+        return await asyncio.to_thread(self._estimate_complexity_sync, code, problem_type)
+
+    def _estimate_complexity_sync(self, code: str, problem_type: str) -> str:
+        features = self._scan(code)
+        found = features["found"]
+
         complexity = {
             "time": "O(n)",  # Default assumption
             "space": "O(1)",
             "reasoning": []
         }
-        
+
         # Check for nested loops
-        nested_for = len(re.findall(r'for.*for', code, re.DOTALL))
+        nested_for = features["nested_for"]
         if nested_for > 0:
             complexity["time"] = "O(n²)"
             complexity["reasoning"].append("Nested loops detected")
-        
+
         # Check for hash map usage (often improves time complexity)
-        if 'Map' in code or 'Object' in code or '{}' in code:
+        if 'Map' in found or 'new Map' in found or 'Object' in found or '{}' in found:
             if nested_for == 0:
                 complexity["time"] = "O(n)"
                 complexity["reasoning"].append("Hash map used for O(1) lookups")
             complexity["space"] = "O(n)"
             complexity["reasoning"].append("Additional data structure stores elements")
-        
+
         # Check for sorting
-        if '.sort(' in code:
+        if '.sort(' in found:
             if complexity["time"] == "O(n)":
                 complexity["time"] = "O(n log n)"
             complexity["reasoning"].append("Sorting operation detected")
-        
+
         # Check for recursion
-        func_names = re.findall(r'function\s+(\w+)', code)
-        for func_name in func_names:
+        for func_name in features["func_names"]:
             if func_name in code.split(func_name, 1)[1]:
                 complexity["reasoning"].append(f"Recursive call to {func_name} detected")
-        
+
         return f"""
 **Complexity Analysis**
 - Time Complexity: {complexity['time']}
@@ -152,40 +225,30 @@ class CodeAnalysisPlugin:
         description="Check if the code handles common edge cases",
         name="check_edge_cases"
     )
-    def check_edge_cases(
+    async def check_edge_cases(
         self,
         code: Annotated[str, "The source code to check"],
         problem_id: Annotated[str, "The problem identifier"]
     ) -> Annotated[str, "Edge case coverage analysis"]:
         """Checks for common edge case handling"""
-        
+        return await asyncio.to_thread(self._check_edge_cases_sync, code, problem_id)
+
+    def _check_edge_cases_sync(self, code: str, problem_id: str) -> str:
+        features = self._scan(code)
+        edge_found = features["edge_found"]
+        edge_ci_found = features["edge_ci_found"]
+
         edge_cases = {
-            "empty_input": False,
-            "single_element": False,
-            "negative_numbers": False,
-            "duplicates": False,
+            "empty_input": bool(edge_found & {'length === 0', 'length == 0', '!nums', 'nums.length < '}),
+            "single_element": bool(edge_found & {'length === 1', 'length == 1'}),
+            "negative_numbers": '< 0' in edge_found or 'negative' in edge_ci_found,
+            "duplicates": 'Set' in edge_found or 'duplicate' in edge_ci_found or 'seen' in edge_found,
             "boundary_values": False
         }
-        
-        # Check for empty array handling
-        if 'length === 0' in code or 'length == 0' in code or '!nums' in code or 'nums.length < ' in code:
-            edge_cases["empty_input"] = True
-        
-        # Check for single element
-        if 'length === 1' in code or 'length == 1' in code:
-            edge_cases["single_element"] = True
-        
-        # Check for negative number handling
-        if '< 0' in code or 'negative' in code.lower():
-            edge_cases["negative_numbers"] = True
-        
-        # Check for duplicate handling
-        if 'Set' in code or 'duplicate' in code.lower() or 'seen' in code:
-            edge_cases["duplicates"] = True
-        
+
         covered = [k for k, v in edge_cases.items() if v]
         missing = [k for k, v in edge_cases.items() if not v]
-        
+
         return f"""
 **Edge Case Analysis**
 - Covered: {', '.join(covered) if covered else 'None explicitly handled'}
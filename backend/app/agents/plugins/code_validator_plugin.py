@@ -3,7 +3,152 @@ Code Validation Plugin for Semantic Kernel
 Silently validates candidate code and provides hints based on errors
 """
 from typing import Annotated, Dict, Any, Optional
+from functools import lru_cache
 from semantic_kernel.functions import kernel_function
+import re
+import sys
+
+try:
+    import hyperscan  # optional: SIMD-backed multi-pattern scanning
+except ImportError:
+    hyperscan = None
+
+# One compiled alternation scans stderr in a single pass instead of
+# re-walking the full string for every error substring; re.IGNORECASE
+# avoids allocating a lowercase copy of large tracebacks
+_STDERR_RE = re.compile(
+    r"(?P<not_defined>is not defined)"
+    r"|(?P<not_function>is not a function)"
+    r"|(?P<null_access>cannot read property|undefined)"
+    r"|(?P<syntax>syntax error)"
+    r"|(?P<recursion>maximum call stack)",
+    re.IGNORECASE,
+)
+
+# Hints emitted in the same priority order as the original checks
+_STDERR_HINTS = (
+    ("not_defined", "Variable or function is not defined - check for typos in variable names"),
+    ("not_function", "Trying to call something that isn't a function - check the data types"),
+    ("null_access", "Accessing a property on null/undefined - add null checks or verify array bounds"),
+    ("syntax", "Syntax error in code - check for missing brackets, semicolons, or typos"),
+    ("recursion", "Infinite recursion detected - check your base case"),
+)
+
+# Failure markers and "expected" mismatches are counted in one stdout pass;
+# the local (?i:) keeps only the "expected" check case-insensitive, matching
+# the original stdout.count/in-lower pair
+_STDOUT_RE = re.compile(r"(?P<fail>✗ Test)|(?P<exp>(?i:expected))")
+
+# Error classification in one scan; priority order is applied afterwards so
+# e.g. a syntax error still wins even when a test-failure marker appears
+# earlier in the output
+_CLASSIFY_RE = re.compile(
+    r"(?P<syntax>syntax)"
+    r"|(?P<timeout>maximum call stack|timeout)"
+    r"|(?P<runtime>undefined|is not a function|cannot read property|typeerror|referenceerror)"
+    r"|(?P<logic>✗ test|failed)",
+    re.IGNORECASE,
+)
+_CLASSIFY_PRIORITY = ("syntax", "timeout", "runtime", "logic")
+
+# Proactive hints by problem and error pattern
+_PROACTIVE_HINTS = {
+    "two-sum": {
+        "undefined": "Make sure you're returning an array of indices, not the values themselves.",
+        "wrong_output": "Remember: you need to return the INDICES of the two numbers, not the numbers. Also check if the order matters.",
+        "timeout": "A nested loop gives O(n²). Can you use a hash map to achieve O(n)?",
+        "syntax": "Check that your function is named 'twoSum' exactly as specified."
+    },
+    "reverse-string": {
+        "undefined": "Are you modifying the array in-place? Remember not to create a new array.",
+        "wrong_output": "The function should modify the input array directly. Use two pointers from both ends.",
+        "timeout": "The two-pointer approach should be O(n). Make sure your loop condition is correct.",
+        "syntax": "The function should be named 'reverseString' and take one parameter."
+    },
+    "valid-palindrome": {
+        "undefined": "Did you handle the case-insensitive comparison?",
+        "wrong_output": "Remember to ignore non-alphanumeric characters and compare case-insensitively.",
+        "timeout": "You can solve this in O(n) with two pointers.",
+        "syntax": "The function should return a boolean (true/false)."
+    },
+    "maximum-subarray": {
+        "undefined": "Are you tracking both the current sum and the maximum sum seen so far?",
+        "wrong_output": "Consider Kadane's algorithm: reset current sum when it goes negative.",
+        "timeout": "This can be solved in O(n) time with Kadane's algorithm.",
+        "syntax": "The function should return a single number, not an array."
+    },
+    "merge-sorted-arrays": {
+        "undefined": "Remember to modify nums1 in-place. Work from the end of both arrays.",
+        "wrong_output": "Start filling nums1 from the end (position m+n-1) to avoid overwriting.",
+        "timeout": "This should be O(m+n) using the three-pointer technique.",
+        "syntax": "The function doesn't return anything - it modifies nums1 in-place."
+    }
+}
+
+
+# When python-hyperscan is installed, the same error patterns are compiled
+# into a Hyperscan database so high-throughput deployments scan stderr with
+# a SIMD DFA; pattern ids index into _STDERR_HINTS. The stdlib regex above
+# remains the fallback.
+_HS_PATTERNS = (
+    (b"is not defined", 0),
+    (b"is not a function", 1),
+    (b"cannot read property", 2),
+    (b"undefined", 2),
+    (b"syntax error", 3),
+    (b"maximum call stack", 4),
+)
+_HS_DB = None
+if hyperscan is not None:
+    try:
+        _HS_DB = hyperscan.Database()
+        _HS_DB.compile(
+            expressions=[p for p, _ in _HS_PATTERNS],
+            ids=[i for _, i in _HS_PATTERNS],
+            flags=[hyperscan.HS_FLAG_CASELESS] * len(_HS_PATTERNS),
+        )
+    except Exception as e:
+        print(f"Hyperscan database compile failed, using re fallback: {e}")
+        _HS_DB = None
+
+
+def _scan_stderr_hint_ids(stderr: str) -> set:
+    """Return the set of _STDERR_HINTS indices triggered by stderr"""
+    if _HS_DB is not None:
+        matched: set = set()
+        _HS_DB.scan(
+            stderr.encode("utf-8", errors="replace"),
+            match_event_handler=lambda pat_id, start, end, flags, ctx: matched.add(pat_id),
+        )
+        return matched
+    groups = {m.lastgroup for m in _STDERR_RE.finditer(stderr)}
+    return {i for i, (group, _) in enumerate(_STDERR_HINTS) if group in groups}
+
+
+# Help decisions ordered by priority; should_offer_help indexes with the
+# strongest matching signal
+_HELP_DECISIONS = (
+    "NO: Candidate appears to be making progress. Let them continue.",
+    "MAYBE: 3 consecutive errors. Consider asking if they'd like a hint.",
+    "YES: Candidate has been struggling for 10+ minutes. Check if they need guidance.",
+    "YES: Candidate has had 5+ consecutive errors. Offer a targeted hint.",
+)
+
+
+# Flat tuple-keyed view with interned keys and values - the nested dict
+# stays as the readable source, lookups touch one frozen table
+_DEFAULT_PROACTIVE = sys.intern("Take a step back and trace through your code with a simple example.")
+_PROACTIVE_FLAT = {
+    (sys.intern(pid), sys.intern(err)): sys.intern(txt)
+    for pid, sub in _PROACTIVE_HINTS.items()
+    for err, txt in sub.items()
+}
+
+
+@lru_cache(maxsize=256)
+def _lookup_proactive(problem_id: str, error_pattern: str) -> str:
+    """Cached single-hash hint lookup - the (problem, error) domain is tiny"""
+    return _PROACTIVE_FLAT.get((problem_id, error_pattern), _DEFAULT_PROACTIVE)
 
 
 class CodeValidatorPlugin:
@@ -30,32 +175,26 @@ class CodeValidatorPlugin:
         
         hints = []
         
-        # Analyze stderr for common errors
+        # Analyze stderr for common errors - single pass over the raw string
         if stderr:
-            stderr_lower = stderr.lower()
-            
-            if "is not defined" in stderr_lower:
-                hints.append("Variable or function is not defined - check for typos in variable names")
-            
-            if "is not a function" in stderr_lower:
-                hints.append("Trying to call something that isn't a function - check the data types")
-            
-            if "cannot read property" in stderr_lower or "undefined" in stderr_lower:
-                hints.append("Accessing a property on null/undefined - add null checks or verify array bounds")
-            
-            if "syntax error" in stderr_lower:
-                hints.append("Syntax error in code - check for missing brackets, semicolons, or typos")
-            
-            if "maximum call stack" in stderr_lower:
-                hints.append("Infinite recursion detected - check your base case")
+            matched_ids = _scan_stderr_hint_ids(stderr)
+            for i, (_, hint) in enumerate(_STDERR_HINTS):
+                if i in matched_ids:
+                    hints.append(hint)
         
-        # Analyze stdout for test failures
+        # Analyze stdout for test failures - one traversal for both markers
         if stdout:
-            failed_tests = stdout.count("✗ Test")
+            failed_tests = 0
+            saw_expected = False
+            for m in _STDOUT_RE.finditer(stdout):
+                if m.lastgroup == "fail":
+                    failed_tests += 1
+                else:
+                    saw_expected = True
             if failed_tests > 0:
                 hints.append(f"{failed_tests} test(s) failing - check edge cases")
-                
-                if "expected" in stdout.lower():
+
+                if saw_expected:
                     hints.append("Output doesn't match expected - verify your logic")
         
         if not hints:
@@ -73,42 +212,8 @@ class CodeValidatorPlugin:
         error_pattern: Annotated[str, "The type of error: 'undefined', 'wrong_output', 'timeout', 'syntax'"]
     ) -> Annotated[str, "A helpful hint without giving away the solution"]:
         """Generate context-aware hints based on error patterns"""
-        
-        hints = {
-            "two-sum": {
-                "undefined": "Make sure you're returning an array of indices, not the values themselves.",
-                "wrong_output": "Remember: you need to return the INDICES of the two numbers, not the numbers. Also check if the order matters.",
-                "timeout": "A nested loop gives O(n²). Can you use a hash map to achieve O(n)?",
-                "syntax": "Check that your function is named 'twoSum' exactly as specified."
-            },
-            "reverse-string": {
-                "undefined": "Are you modifying the array in-place? Remember not to create a new array.",
-                "wrong_output": "The function should modify the input array directly. Use two pointers from both ends.",
-                "timeout": "The two-pointer approach should be O(n). Make sure your loop condition is correct.",
-                "syntax": "The function should be named 'reverseString' and take one parameter."
-            },
-            "valid-palindrome": {
-                "undefined": "Did you handle the case-insensitive comparison?",
-                "wrong_output": "Remember to ignore non-alphanumeric characters and compare case-insensitively.",
-                "timeout": "You can solve this in O(n) with two pointers.",
-                "syntax": "The function should return a boolean (true/false)."
-            },
-            "maximum-subarray": {
-                "undefined": "Are you tracking both the current sum and the maximum sum seen so far?",
-                "wrong_output": "Consider Kadane's algorithm: reset current sum when it goes negative.",
-                "timeout": "This can be solved in O(n) time with Kadane's algorithm.",
-                "syntax": "The function should return a single number, not an array."
-            },
-            "merge-sorted-arrays": {
-                "undefined": "Remember to modify nums1 in-place. Work from the end of both arrays.",
-                "wrong_output": "Start filling nums1 from the end (position m+n-1) to avoid overwriting.",
-                "timeout": "This should be O(m+n) using the three-pointer technique.",
-                "syntax": "The function doesn't return anything - it modifies nums1 in-place."
-            }
-        }
-        
-        problem_hints = hints.get(problem_id, {})
-        return problem_hints.get(error_pattern, "Take a step back and trace through your code with a simple example.")
+
+        return _lookup_proactive(problem_id, error_pattern)
 
     @kernel_function(
         description="Determine if the AI should offer help based on candidate's struggle indicators",
@@ -121,21 +226,14 @@ class CodeValidatorPlugin:
         total_attempts: Annotated[int, "Total number of code runs"]
     ) -> Annotated[str, "YES/NO and reason"]:
         """Decide if the AI should proactively offer assistance"""
-        
-        # Very stuck - 5+ consecutive errors
-        if consecutive_errors >= 5:
-            return "YES: Candidate has had 5+ consecutive errors. Offer a targeted hint."
-        
-        # Stuck for a while with attempts
-        if time_since_last_success_minutes >= 10 and total_attempts >= 3:
-            return "YES: Candidate has been struggling for 10+ minutes. Check if they need guidance."
-        
-        # Just started struggling
-        if consecutive_errors >= 3:
-            return "MAYBE: 3 consecutive errors. Consider asking if they'd like a hint."
-        
-        # Making progress
-        return "NO: Candidate appears to be making progress. Let them continue."
+
+        # Strongest signal wins; bool arithmetic replaces the branch ladder
+        idx = max(
+            3 * (consecutive_errors >= 5),
+            2 * (time_since_last_success_minutes >= 10 and total_attempts >= 3),
+            1 * (consecutive_errors >= 3),
+        )
+        return _HELP_DECISIONS[idx]
 
     @kernel_function(
         description="Classify the type of error from stderr/stdout",
@@ -150,19 +248,10 @@ class CodeValidatorPlugin:
         
         if not stderr and not stdout:
             return "none"
-        
-        combined = (stderr + stdout).lower()
-        
-        if "syntax" in combined:
-            return "syntax"
-        
-        if "maximum call stack" in combined or "timeout" in combined:
-            return "timeout"
-        
-        if any(err in combined for err in ["undefined", "is not a function", "cannot read property", "typeerror", "referenceerror"]):
-            return "runtime"
-        
-        if "✗ test" in combined or "failed" in combined:
-            return "logic"
-        
+
+        found = {m.lastgroup for m in _CLASSIFY_RE.finditer(stderr + stdout)}
+        for kind in _CLASSIFY_PRIORITY:
+            if kind in found:
+                return kind
+
         return "none"
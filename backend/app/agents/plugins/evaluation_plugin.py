@@ -3,9 +3,129 @@ Evaluation Plugin for Semantic Kernel
 Provides real-time candidate evaluation and scoring
 """
 from typing import Annotated
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from semantic_kernel.functions import kernel_function
 import re
 
+# Threshold tables for the efficiency score and the letter grade; one
+# C-level bisect replaces each if/elif ladder. bisect_left keeps the <=
+# boundary semantics for time, bisect_right the >= semantics for grade.
+_EFF_CUTS = (15, 25, 40)
+_EFF_VALS = (20, 15, 10, 5)
+_GRADE_CUTS = (55, 70, 85)
+_GRADES = ("Needs Improvement", "Satisfactory", "Good", "Excellent")
+
+# Precompiled at import so scoring calls skip the re module's per-call
+# pattern parse/cache lookup
+_COMMENT_RE = re.compile(r'//|/\*')
+_COMMENT_FULL_RE = re.compile(r'//.*\n|/\*[\s\S]*?\*/')
+
+# All code features used by scoring and feedback in one alternation so a
+# submission is traversed once instead of once per check; the patterns are
+# mutually disjoint so no match can swallow another feature's text
+_CODE_FEAT_RE = re.compile(
+    r'(?P<map>\.map\()'
+    r'|(?P<filter>\.filter\()'
+    r'|(?P<reduce>\.reduce\()'
+    r'|(?P<const>const )'
+    r'|(?P<let>let )'
+    r'|(?P<hashmap>Map|\{\})'
+    r'|(?P<var>var )'
+    r'|(?P<log>console\.log)'
+)
+_FEAT_NAMES = ("map", "filter", "reduce", "const", "let", "hashmap", "var", "log")
+
+
+@lru_cache(maxsize=256)
+def _code_features(code: str) -> dict:
+    """One-pass feature extraction shared by calculate_score and
+    generate_feedback, cached so repeat evaluations of the same submission
+    are free"""
+    feats = dict.fromkeys(_FEAT_NAMES, False)
+    for m in _CODE_FEAT_RE.finditer(code):
+        feats[m.lastgroup] = True
+    # The comment patterns can overlap line content, so they run as separate
+    # first-match searches rather than consuming alternatives in the scan
+    feats["cmt"] = _COMMENT_RE.search(code) is not None
+    feats["comment_full"] = _COMMENT_FULL_RE.search(code) is not None
+    return feats
+
+# Follow-up decisions indexed by all_passed*2 + has_time
+_FOLLOWUP_DECISIONS = (
+    "NO - Focus on completing the current problem first.",
+    "NO - Focus on completing the current problem first.",
+    "DISCUSS - All tests passed. Use remaining time to discuss the approach and complexity.",
+    "YES - Candidate solved the problem with time remaining. Suggest discussing optimization or a follow-up variation.",
+)
+
+
+@lru_cache(maxsize=512)
+def _score(
+    tests_passed: int,
+    total_tests: int,
+    time_spent_minutes: int,
+    hints_used: int,
+    has_var: bool,
+    has_comment: bool,
+    too_compact: bool,
+    has_console_log: bool,
+) -> str:
+    """Pure scoring body, cached on the small hashable feature set"""
+
+    scores = {
+        "correctness": 0,
+        "efficiency": 0,
+        "code_quality": 0,
+        "problem_solving": 0,
+        "communication": 0  # Would need chat analysis for real scoring
+    }
+
+    # Correctness (40 points max)
+    if total_tests > 0:
+        correctness_pct = tests_passed / total_tests
+        scores["correctness"] = int(correctness_pct * 40)
+
+    # Efficiency (20 points max) - based on time and approach
+    scores["efficiency"] = _EFF_VALS[bisect_left(_EFF_CUTS, time_spent_minutes)]
+
+    # Code Quality (20 points max)
+    quality_score = 20
+    if has_var:
+        quality_score -= 3
+    if not has_comment:
+        quality_score -= 2
+    if too_compact:
+        quality_score -= 2
+    if has_console_log:
+        quality_score -= 1
+    scores["code_quality"] = max(0, quality_score)
+
+    # Problem Solving (20 points max) - reduced by hints used
+    base_problem_solving = 20
+    hint_penalty = hints_used * 3
+    scores["problem_solving"] = max(0, base_problem_solving - hint_penalty)
+
+    # Total
+    total = sum(scores.values())
+    grade = _GRADES[bisect_right(_GRADE_CUTS, total)]
+
+    # O(n) join over fixed lines instead of a large f-string concatenation
+    return "\n".join((
+        "",
+        f"**Evaluation Score: {total}/100**",
+        "",
+        "| Dimension | Score | Notes |",
+        "|-----------|-------|-------|",
+        f"| Correctness | {scores['correctness']}/40 | {tests_passed}/{total_tests} tests passed |",
+        f"| Efficiency | {scores['efficiency']}/20 | Completed in {time_spent_minutes} min |",
+        f"| Code Quality | {scores['code_quality']}/20 | Style and readability |",
+        f"| Problem Solving | {scores['problem_solving']}/20 | {hints_used} hints used |",
+        "",
+        f"**Grade:** {grade}",
+        "",
+    ))
+
 
 class EvaluationPlugin:
     """
@@ -26,62 +146,19 @@ class EvaluationPlugin:
         hints_used: Annotated[int, "Number of hints requested"]
     ) -> Annotated[str, "Scoring breakdown"]:
         """Calculates a multi-dimensional score"""
-        
-        scores = {
-            "correctness": 0,
-            "efficiency": 0,
-            "code_quality": 0,
-            "problem_solving": 0,
-            "communication": 0  # Would need chat analysis for real scoring
-        }
-        
-        # Correctness (40 points max)
-        if total_tests > 0:
-            correctness_pct = tests_passed / total_tests
-            scores["correctness"] = int(correctness_pct * 40)
-        
-        # Efficiency (20 points max) - based on time and approach
-        if time_spent_minutes <= 15:
-            scores["efficiency"] = 20
-        elif time_spent_minutes <= 25:
-            scores["efficiency"] = 15
-        elif time_spent_minutes <= 40:
-            scores["efficiency"] = 10
-        else:
-            scores["efficiency"] = 5
-        
-        # Code Quality (20 points max)
-        quality_score = 20
-        if 'var ' in code:
-            quality_score -= 3
-        if not re.search(r'//|/\*', code):  # No comments
-            quality_score -= 2
-        if code.count('\n') < 3:  # Too compact
-            quality_score -= 2
-        if 'console.log' in code:
-            quality_score -= 1
-        scores["code_quality"] = max(0, quality_score)
-        
-        # Problem Solving (20 points max) - reduced by hints used
-        base_problem_solving = 20
-        hint_penalty = hints_used * 3
-        scores["problem_solving"] = max(0, base_problem_solving - hint_penalty)
-        
-        # Total
-        total = sum(scores.values())
-        
-        return f"""
-**Evaluation Score: {total}/100**
 
-| Dimension | Score | Notes |
-|-----------|-------|-------|
-| Correctness | {scores['correctness']}/40 | {tests_passed}/{total_tests} tests passed |
-| Efficiency | {scores['efficiency']}/20 | Completed in {time_spent_minutes} min |
-| Code Quality | {scores['code_quality']}/20 | Style and readability |
-| Problem Solving | {scores['problem_solving']}/20 | {hints_used} hints used |
-
-**Grade:** {'Excellent' if total >= 85 else 'Good' if total >= 70 else 'Satisfactory' if total >= 55 else 'Needs Improvement'}
-"""
+        # Feature bits come from the shared extractor so the cache key stays small
+        feats = _code_features(code)
+        return _score(
+            tests_passed,
+            total_tests,
+            time_spent_minutes,
+            hints_used,
+            feats["var"],
+            feats["cmt"],
+            code.count('\n') < 3,  # Too compact; str.count is already C-level
+            feats["log"],
+        )
 
     @kernel_function(
         description="Generate feedback for the candidate based on their performance",
@@ -97,18 +174,19 @@ class EvaluationPlugin:
         
         strengths = []
         improvements = []
-        
-        # Analyze code for feedback
-        if '.map(' in code or '.filter(' in code or '.reduce(' in code:
+
+        # Analyze code for feedback via the shared one-pass extractor
+        feats = _code_features(code)
+        if feats["map"] or feats["filter"] or feats["reduce"]:
             strengths.append("Good use of functional programming methods")
-        
-        if 'const ' in code and 'let ' in code:
+
+        if feats["const"] and feats["let"]:
             strengths.append("Proper use of const/let for variable declarations")
-        
-        if re.search(r'//.*\n|/\*[\s\S]*?\*/', code):
+
+        if feats["comment_full"]:
             strengths.append("Code includes helpful comments")
-        
-        if 'Map' in code or '{}' in code:
+
+        if feats["hashmap"]:
             strengths.append("Efficient use of hash map for lookups")
         
         # Improvements based on score
@@ -122,15 +200,17 @@ class EvaluationPlugin:
         elif main_weakness == "code_quality":
             improvements.append("Add comments and use meaningful variable names")
         
-        return f"""
-**Performance Feedback**
-
-✅ **Strengths:**
-{chr(10).join(f'  - {s}' for s in strengths) if strengths else '  - Keep practicing!'}
-
-📈 **Areas for Improvement:**
-{chr(10).join(f'  - {i}' for i in improvements) if improvements else '  - Great job overall!'}
-"""
+        return "\n".join((
+            "",
+            "**Performance Feedback**",
+            "",
+            "✅ **Strengths:**",
+            "\n".join('  - ' + s for s in strengths) if strengths else '  - Keep practicing!',
+            "",
+            "📈 **Areas for Improvement:**",
+            "\n".join('  - ' + i for i in improvements) if improvements else '  - Great job overall!',
+            "",
+        ))
 
     @kernel_function(
         description="Determine if the candidate should receive a follow-up challenge",
@@ -143,13 +223,9 @@ class EvaluationPlugin:
         time_remaining_minutes: Annotated[int, "Time remaining in the interview"]
     ) -> Annotated[str, "Whether to give a follow-up and why"]:
         """Decides if a follow-up challenge is appropriate"""
-        
+
         all_passed = tests_passed == total_tests
         has_time = time_remaining_minutes >= 10
-        
-        if all_passed and has_time:
-            return "YES - Candidate solved the problem with time remaining. Suggest discussing optimization or a follow-up variation."
-        elif all_passed:
-            return "DISCUSS - All tests passed. Use remaining time to discuss the approach and complexity."
-        else:
-            return "NO - Focus on completing the current problem first."
+
+        # Two booleans index straight into the decision table
+        return _FOLLOWUP_DECISIONS[all_passed * 2 + has_time]
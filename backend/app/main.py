@@ -2,24 +2,33 @@
 Main FastAPI application with Socket.io integration
 This is the entry point for the backend server
 """
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 import base64
-import aiohttp
-from fastapi import FastAPI, HTTPException
+import logging
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 import socketio
+from fastapi.middleware.gzip import GZipMiddleware
 from app.config import settings
 from app.websocket.socket_manager import sio
 
+# Configure logging once at the entry point; library modules only call
+# logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    # orjson serializes responses (notably CodeExecution dumps with large
+    # stdout) several times faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -31,6 +40,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON payloads (notably /api/tts with base64 audio)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Mount Socket.io
 socket_app = socketio.ASGIApp(
     sio,
@@ -59,12 +71,13 @@ class STTRequest(BaseModel):
     audio: str  # Base64 encoded audio
 
 @app.post("/api/run_code")
-async def run_code_api(request: RunCodeRequest):
-    """Execute code via Judge0 (REST API)"""
+async def run_code_api(request: RunCodeRequest, nocache: int = 0):
+    """Execute code via Judge0 (REST API). Pass ?nocache=1 to force a
+    fresh run past the result cache."""
     try:
         from app.services.judge0_service import Judge0Service
         judge = Judge0Service()
-        result = await judge.execute_code(request.code, request.problem_id)
+        result = await judge.execute_code(request.code, request.problem_id, use_cache=not nocache)
         return result
     except Exception as e:
         return {"status": "error", "stderr": str(e)}
@@ -74,16 +87,35 @@ async def text_to_speech(request: TTSRequest):
     """
     Convert text to speech using Azure Speech Services.
     Returns audio as base64 encoded MP3.
+
+    Prefer /api/tts/audio for playback: it returns the raw bytes and
+    skips the base64 + JSON overhead entirely.
     """
     try:
-        from app.services.speech_service import get_speech_service
-        
+        from app.services.speech_service import get_speech_service, get_tts_cache, TTSCache
+
+        cache = get_tts_cache()
+        cache_key = TTSCache.key(request.voice, request.text)
+        cached = cache.get(cache_key)
+        if cached:
+            return {
+                "success": True,
+                "audio": cached[1],
+                "format": "mp3",
+                "voice": request.voice
+            }
+
         speech_service = get_speech_service()
-        audio_data = await speech_service.text_to_speech(request.text)
-        
+        audio_data = await speech_service.text_to_speech(request.text, request.voice)
+
         if audio_data:
-            # Return as base64 for easy frontend consumption
-            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
+            # Encode off the event loop (large MP3s take milliseconds in
+            # pure Python); the cache stores the base64 form for later hits
+            encoded = await asyncio.get_event_loop().run_in_executor(
+                None, base64.b64encode, audio_data
+            )
+            audio_base64 = encoded.decode('ascii')
+            cache.put(cache_key, audio_data, audio_base64)
             return {
                 "success": True,
                 "audio": audio_base64,
@@ -99,26 +131,43 @@ async def text_to_speech(request: TTSRequest):
         raise HTTPException(status_code=500, detail=f"TTS error: {str(e)}")
 
 @app.post("/api/tts/audio")
-async def text_to_speech_audio(request: TTSRequest):
+async def text_to_speech_audio(request: TTSRequest, http_request: Request):
     """
     Convert text to speech and return raw audio bytes.
     Use this for direct audio playback.
     """
     try:
-        from app.services.speech_service import get_speech_service
-        
-        speech_service = get_speech_service()
-        audio_data = await speech_service.text_to_speech(request.text)
-        
+        from app.services.speech_service import get_speech_service, get_tts_cache, TTSCache
+
+        cache = get_tts_cache()
+        cache_key = TTSCache.key(request.voice, request.text)
+        etag = cache_key.split(":", 1)[1]
+
+        # Browsers replay intros often - let them 304 on repeat plays
+        if http_request.headers.get("if-none-match") == etag:
+            return Response(status_code=304)
+
+        cached = cache.get(cache_key)
+        if cached:
+            audio_data = cached[0]
+        else:
+            speech_service = get_speech_service()
+            audio_data = await speech_service.text_to_speech(request.text, request.voice)
+            if audio_data:
+                cache.put(cache_key, audio_data)
+
         if audio_data:
             return Response(
                 content=audio_data,
                 media_type="audio/mpeg",
-                headers={"Content-Disposition": "inline; filename=speech.mp3"}
+                headers={
+                    "Content-Disposition": "inline; filename=speech.mp3",
+                    "ETag": etag
+                }
             )
         else:
             raise HTTPException(status_code=500, detail="Failed to generate speech")
-            
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"TTS error: {str(e)}")
 
@@ -129,12 +178,13 @@ async def speech_to_text(request: STTRequest):
     Accepts base64 encoded audio (WAV or WebM).
     """
     try:
-        import base64
         from app.services.speech_service import get_speech_service
-        
-        # Decode base64 audio
-        audio_data = base64.b64decode(request.audio)
-        
+
+        # Decode base64 audio and drop the (larger) base64 string right
+        # away so both copies aren't held during recognition
+        audio_data = base64.b64decode(request.audio, validate=False)
+        request.audio = ""
+
         speech_service = get_speech_service()
         text = await speech_service.speech_to_text_from_audio(audio_data)
         
@@ -155,6 +205,36 @@ async def speech_to_text(request: STTRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"STT error: {str(e)}")
 
+@app.post("/api/stt/stream")
+async def speech_to_text_stream(http_request: Request):
+    """
+    Streaming STT: POST raw audio bytes (WAV/WebM) as the request body.
+    Chunks feed the recognizer as they arrive, so recognition starts
+    before the upload finishes.
+    """
+    try:
+        from app.services.speech_service import get_speech_service
+
+        speech_service = get_speech_service()
+        text = await speech_service.speech_to_text_from_stream(http_request.stream())
+
+        if text:
+            return {
+                "success": True,
+                "text": text
+            }
+        else:
+            return {
+                "success": False,
+                "text": "",
+                "message": "No speech recognized"
+            }
+
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"STT error: {str(e)}")
+
 @app.post("/api/session/configure")
 async def configure_session(request: SessionConfigRequest):
     """
@@ -201,6 +281,21 @@ async def configure_session(request: SessionConfigRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Session config error: {str(e)}")
 
+@app.on_event("shutdown")
+async def shutdown_shared_clients():
+    """Close the shared HTTP clients on server shutdown"""
+    from app.agents.sk_agent import close_shared_http_client
+    from app.services import semantic_cache, speech_service
+    from app.services.judge0_service import close_judge0_client
+    from app.services.piston_service import close_piston_session
+    await close_shared_http_client()
+    await close_judge0_client()
+    await close_piston_session()
+    if semantic_cache._semantic_cache is not None:
+        await semantic_cache._semantic_cache.flush()
+    if speech_service._speech_service is not None:
+        speech_service._speech_service.close()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -211,27 +306,71 @@ async def root():
         "features": ["tts", "stt", "dynamic_problems", "agentic_ai"]
     }
 
+# Probe-result cache for /health: liveness probes and frontend polling can
+# hit the endpoint many times a second, and during a Judge0 outage every
+# uncached probe would block for its full timeout
+_HEALTH_PROBE_TTL = 5.0
+_health_cache = {"ts": 0.0, "judge0": None}
+
+
+async def _probe_judge0() -> str:
+    """Probe Judge0, re-using a recent result within the TTL"""
+    import time
+
+    now = time.monotonic()
+    if _health_cache["judge0"] is not None and now - _health_cache["ts"] <= _HEALTH_PROBE_TTL:
+        return _health_cache["judge0"]
+
+    try:
+        from app.services.judge0_service import get_judge0_client
+        client = get_judge0_client()
+        judge0_url = f"{settings.JUDGE0_ENDPOINT}/about"
+        # wait_for rather than asyncio.timeout: the backend documents a
+        # Python 3.9 minimum
+        response = await asyncio.wait_for(client.get(judge0_url), timeout=1.0)
+        result = "connected" if response.status_code == 200 else f"error: {response.status_code}"
+    except asyncio.TimeoutError:
+        result = "unreachable: probe timed out"
+    except Exception as e:
+        result = f"unreachable: {str(e)}"
+
+    _health_cache["ts"] = now
+    _health_cache["judge0"] = result
+    return result
+
+
+# The /health timestamp only needs 1-second granularity, so the ISO string
+# is rebuilt at most once per second instead of on every probe
+_last_ts = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as ISO-8601, cached per whole second"""
+    global _last_ts
+    import time
+
+    now = int(time.time())
+    if now != _last_ts[0]:
+        _last_ts = (now, datetime.now(timezone.utc).isoformat())
+    return _last_ts[1]
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint to verify backend and services"""
     status = {
         "status": "online",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _utc_timestamp(),
         "services": {
             "judge0": "unknown",
             "azure_speech": "unknown"
         }
     }
-    
-    # Check Judge0
-    try:
-        async with aiohttp.ClientSession() as session:
-            judge0_url = f"{settings.JUDGE0_ENDPOINT}/about"
-            async with session.get(judge0_url, timeout=2) as response:
-                status["services"]["judge0"] = "connected" if response.status == 200 else f"error: {response.status}"
-    except Exception as e:
-        status["services"]["judge0"] = f"unreachable: {str(e)}"
-    
+
+    # Check Judge0 (shared session, TTL-cached so probe storms don't
+    # amplify into outbound request storms)
+    status["services"]["judge0"] = await _probe_judge0()
+
     # Check Azure Speech
     if settings.AZURE_SPEECH_KEY and settings.AZURE_SPEECH_REGION:
         status["services"]["azure_speech"] = "configured"
@@ -1,11 +1,18 @@
 """
 Data models for interview sessions and related entities
 """
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from enum import Enum
 
+# Caps on the per-session history lists: serializing a session (socket.io
+# broadcasts, dumps) is O(list length), so unbounded growth makes every
+# emit slower as the interview runs on
+MAX_EXECUTIONS = 20
+MAX_CHAT_MESSAGES = 50
+MAX_PROCTORING_EVENTS = 200
+
 class SessionStatus(str, Enum):
     """Interview session status"""
     WAITING = "waiting"
@@ -41,7 +48,7 @@ class ChatMessage(BaseModel):
     """Chat message between candidate and AI interviewer"""
     role: str  # 'user' or 'assistant'
     content: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class InterviewSession(BaseModel):
     """Complete interview session state"""
@@ -74,6 +81,23 @@ class InterviewSession(BaseModel):
     last_error_message: Optional[str] = None
     hint_given: bool = False
     
+    def add_execution(self, execution: CodeExecution):
+        """Record an execution, keeping only the most recent ones; the
+        last_execution mirror stays O(1) to broadcast"""
+        self.executions.append(execution)
+        del self.executions[:-MAX_EXECUTIONS]
+        self.last_execution = execution
+
+    def add_chat_message(self, message: ChatMessage):
+        """Record a chat message, keeping only the most recent ones"""
+        self.chat_history.append(message)
+        del self.chat_history[:-MAX_CHAT_MESSAGES]
+
+    def add_proctoring_event(self, event: ProctoringEvent):
+        """Record a proctoring event, keeping only the most recent ones"""
+        self.proctoring_events.append(event)
+        del self.proctoring_events[:-MAX_PROCTORING_EVENTS]
+
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
@@ -2,20 +2,204 @@
 Judge0 service for executing JavaScript code
 Handles submission, polling, and result parsing
 """
-import aiohttp
 import asyncio
 import base64
-from typing import Dict, Any
+import binascii
+import hashlib
+import random
+import re
+import ssl
+import time
+import httpx
+import orjson
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional
+from pydantic import TypeAdapter
 from app.config import settings
 from app.models.session import CodeExecution
 
+logger = logging.getLogger(__name__)
+
+# Cached validator for the hot result-construction path: validate_python
+# on a prebuilt dict goes straight to the core schema, skipping the model
+# __init__/kwargs machinery on every finished submission
+_CODE_EXECUTION = TypeAdapter(CodeExecution)
+
+
+# Shared HTTP client: one TCP+TLS setup per Judge0 host with keep-alive
+# across the submission POST and all polling GETs, instead of a fresh
+# connection (and handshake) per retry attempt. HTTP/2 multiplexes
+# concurrent submissions over a single connection, so N candidates
+# running code at once no longer need N sockets to Judge0.
+_client: Optional[httpx.AsyncClient] = None
+
+# One SSLContext for every Judge0 connection, built once at import. Context
+# construction parses CA bundles and allocates OpenSSL state, so sharing it
+# avoids that per-connection and lets TLS session resumption work across
+# reconnects. Verification stays off to match the previous per-call
+# ssl=False behaviour (RapidAPI via corporate proxies broke otherwise).
+_ssl_context = ssl.create_default_context()
+_ssl_context.check_hostname = False
+_ssl_context.verify_mode = ssl.CERT_NONE
+
+
+def get_judge0_client() -> httpx.AsyncClient:
+    """Get or create the shared Judge0 HTTP client"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            verify=_ssl_context,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=32,
+                keepalive_expiry=60
+            ),
+            timeout=httpx.Timeout(10.0, connect=5.0)
+        )
+    return _client
+
+
+async def close_judge0_client():
+    """Close the shared client (called from the app shutdown hook)"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+# Matches the harness summary line ("5/5 tests passed") in one C-level
+# sweep over the raw bytes, replacing a full stdout split plus per-line
+# substring checks
+_TESTS_RE = re.compile(rb'(\d+)\s*/\s*(\d+)\s+tests passed')
+
+# Base64 decode is C-level but still holds the GIL; outputs past this
+# size get decoded in a worker thread so the event loop keeps serving
+# other sessions' polls in the meantime
+_B64_OFFLOAD_BYTES = 16384
+
+
+# Per-problem artifacts are pure functions of problem_id (the template
+# problems are static), so they're memoized module-wide: repeat runs only
+# pay for encoding the candidate's solution
+@lru_cache(maxsize=128)
+def _test_code_for_problem(problem_id: str) -> str:
+    """Monolithic test harness for a problem ('' when unknown)"""
+    from app.services.problem_service import get_problem_service
+
+    problem_service = get_problem_service()
+    problem = problem_service.get_problem(problem_id)
+
+    if problem:
+        return problem_service.generate_test_code(problem)
+
+    return ""
+
+
+@lru_cache(maxsize=128)
+def _export_name(problem_id: str) -> str:
+    """Function name exported by the solution for a problem"""
+    export_names = {
+        "two-sum": "twoSum",
+        "reverse-string": "reverseString",
+        "valid-palindrome": "isPalindrome",
+        "maximum-subarray": "maxSubArray",
+        "merge-sorted-arrays": "merge",
+    }
+    return export_names.get(problem_id, problem_id.replace("-", ""))
+
+
+@lru_cache(maxsize=128)
+def _inline_test_code(problem_id: str) -> str:
+    """Test harness with the require() stripped, ready to append inline"""
+    test_code = _test_code_for_problem(problem_id)
+    if not test_code:
+        return ""
+    return test_code.replace(
+        f"const {{ {_export_name(problem_id)} }} = require('./solution.js');", ""
+    )
+
+
+# The harness halves of the submitted blobs are static per problem, so
+# their UTF-8 encode happens once here; per-request work is one bytes
+# concatenation with the candidate's solution instead of an f-string
+# build plus a full re-encode
+@lru_cache(maxsize=128)
+def _inline_test_bytes(problem_id: str) -> bytes:
+    """Pre-encoded inline harness suffix for the single-blob path"""
+    test_code_inline = _inline_test_code(problem_id)
+    if not test_code_inline:
+        return b""
+    return f"\n\n// Tests\n{test_code_inline}\n".encode()
+
+
+@lru_cache(maxsize=128)
+def _test_snippet_tails(problem_id: str) -> tuple:
+    """Pre-encoded per-test harness suffixes for the batch path"""
+    return tuple(
+        f"\n\n// Test\n{snippet}".encode()
+        for snippet in _test_snippets_for_problem(problem_id)
+    )
+
+
+@lru_cache(maxsize=128)
+def _test_snippets_for_problem(problem_id: str) -> tuple:
+    """Per-test harnesses for batch submission (empty when unsplittable)"""
+    from app.services.problem_service import get_problem_service
+
+    problem_service = get_problem_service()
+    problem = problem_service.get_problem(problem_id)
+
+    if problem:
+        return tuple(problem_service.generate_test_cases(problem))
+
+    return ()
+
+
+# Result cache: candidates re-run identical code constantly (typo-fix
+# loops, "Run" spam), and each re-run otherwise pays the full Judge0
+# round-trip. Bounded LRU with a TTL, keyed by (problem_id, code digest).
+_RESULT_CACHE_MAX = 1024
+_RESULT_CACHE_TTL = 600  # seconds
+_result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+def _cache_get(key: tuple) -> Optional[CodeExecution]:
+    """Return a cached execution result, or None on miss/expiry"""
+    entry = _result_cache.get(key)
+    if entry is None:
+        return None
+    ts, result = entry
+    if time.monotonic() - ts > _RESULT_CACHE_TTL:
+        _result_cache.pop(key, None)
+        return None
+    _result_cache.move_to_end(key)
+    return result
+
+
+# Single-flight map: concurrent misses for the same (problem, code) key
+# coalesce onto the first outstanding submission instead of each hitting
+# Judge0 (double-clicked "Run", shared starter templates under load)
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+def _cache_put(key: tuple, result: CodeExecution):
+    """Store a terminal execution result, evicting oldest past the cap"""
+    _result_cache[key] = (time.monotonic(), result)
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > _RESULT_CACHE_MAX:
+        _result_cache.popitem(last=False)
+
 
 class Judge0Service:
     """Service for executing code via Judge0 API"""
-    
-    def __init__(self):
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.base_url = settings.JUDGE0_ENDPOINT
         self.api_key = settings.JUDGE0_API_KEY
+        self._client = client
         
         self.headers = {
             "content-type": "application/json"
@@ -25,223 +209,495 @@ class Judge0Service:
         if self.api_key:
             self.headers["X-RapidAPI-Key"] = self.api_key
             self.headers["X-RapidAPI-Host"] = "judge0-ce.p.rapidapi.com"
+
+        # Self-hosted Judge0 accepts raw source, skipping the base64
+        # round-trip (4/3x byte inflation on the wire plus encode/decode
+        # CPU both ways); the RapidAPI cloud needs the base64 form
+        self._b64 = bool(self.api_key)
+        self._b64_param = "true" if self._b64 else "false"
     
     def _get_test_code_for_problem(self, problem_id: str) -> str:
-        """Get test code for a problem from the problem service"""
-        from app.services.problem_service import get_problem_service
-        
-        problem_service = get_problem_service()
-        problem = problem_service.get_problem(problem_id)
-        
-        if problem:
-            return problem_service.generate_test_code(problem)
-        
-        return ""
-    
+        """Get test code for a problem from the problem service (memoized)"""
+        return _test_code_for_problem(problem_id)
+
+    def _get_test_snippets_for_problem(self, problem_id: str) -> tuple:
+        """Get per-test harnesses for a problem (memoized; empty when the
+        problem's harness doesn't split cleanly)"""
+        return _test_snippets_for_problem(problem_id)
+
     def _get_export_name(self, problem_id: str) -> str:
-        """Get the function name to export based on problem ID"""
-        export_names = {
-            "two-sum": "twoSum",
-            "reverse-string": "reverseString",
-            "valid-palindrome": "isPalindrome",
-            "maximum-subarray": "maxSubArray",
-            "merge-sorted-arrays": "merge",
-        }
-        return export_names.get(problem_id, problem_id.replace("-", ""))
-    
-    async def execute_code(self, source_code: str, problem_id: str) -> CodeExecution:
+        """Get the function name to export based on problem ID (memoized)"""
+        return _export_name(problem_id)
+
+
+    async def execute_code(self, source_code: str, problem_id: str, use_cache: bool = True) -> CodeExecution:
         """
         Execute JavaScript code with test cases
-        
+
         Args:
             source_code: The candidate's solution code
             problem_id: Problem identifier to get test cases
-            
+            use_cache: Serve repeat runs of identical code from the cache
+
         Returns:
             CodeExecution model with results
         """
-        
-        # Get test cases dynamically from problem service
-        test_code = self._get_test_code_for_problem(problem_id)
-        
-        if not test_code:
+
+        cache_key = (problem_id, hashlib.sha256(source_code.encode()).digest())
+        if use_cache:
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                return cached.model_copy(deep=True)
+
+            # Coalesce onto an identical submission already in flight
+            pending = _inflight.get(cache_key)
+            if pending is not None:
+                result = await pending
+                return result.model_copy(deep=True)
+
+        future = asyncio.get_running_loop().create_future() if use_cache else None
+        if future is not None:
+            _inflight[cache_key] = future
+
+        try:
+            result = await self._execute_uncached(source_code, problem_id)
+        except Exception as e:
+            if future is not None:
+                future.set_exception(e)
+                future.exception()  # mark retrieved for the no-waiter case
+            raise
+        else:
+            if future is not None:
+                future.set_result(result)
+        finally:
+            if future is not None:
+                _inflight.pop(cache_key, None)
+
+        # Don't cache timeouts/transient errors so a Judge0 hiccup can't
+        # poison future runs of the same code
+        if use_cache and result.status not in ("timeout", "error"):
+            _cache_put(cache_key, result.model_copy(deep=True))
+
+        return result
+
+    async def _execute_uncached(self, source_code: str, problem_id: str) -> CodeExecution:
+        """Submit and run the code (batch path, then single-blob fallback)"""
+
+        # Prefer batch submission: one HTTP request each way instead of one
+        # per test, per-test isolation (a crashing test no longer takes the
+        # whole run down), and Judge0 workers execute the tests in parallel
+        if self._get_test_snippets_for_problem(problem_id):
+            batch_result = await self._execute_batch(source_code, problem_id)
+            if batch_result is not None:
+                return batch_result
+            # Batch endpoint unavailable - fall through to the single blob
+
+        # Pre-encoded per-problem test suffix (already stripped of
+        # require()); per-request work is one bytes concatenation with the
+        # candidate's solution
+        test_suffix = _inline_test_bytes(problem_id)
+
+        if not test_suffix:
             return CodeExecution(
                 status="error",
                 stderr=f"No test cases found for problem: {problem_id}",
                 test_passed=False,
                 test_total=0
             )
-        
-        # Get the correct export name for this problem
-        export_name = self._get_export_name(problem_id)
-        
-        # Combine solution code with test code
-        # Remove the require statement from test code since we're combining them
-        test_code_inline = test_code.replace(f"const {{ {export_name} }} = require('./solution.js');", "")
-        
+
         # Create full code: solution + test
-        full_code = f"""// Solution
-{source_code}
+        full_bytes = b"// Solution\n" + source_code.encode() + test_suffix
 
-// Tests
-{test_code_inline}
-"""
-        
         # Prepare submission - combine everything into source_code
         submission_data = {
             "language_id": 63,  # JavaScript (Node.js)
-            "source_code": base64.b64encode(full_code.encode()).decode(),
+            "source_code": base64.b64encode(full_bytes).decode() if self._b64 else full_bytes.decode(),
             "stdin": "",
             "expected_output": ""
         }
         
+        client = self._client or get_judge0_client()
+
         last_error = None
-        # Aggressive retry: 10 attempts (wait up to 15s total)
-        for attempt in range(10):
-            try:
-                async with aiohttp.ClientSession() as session:
+        honored_retry_after = False
+
+        # Exponential backoff with jitter under a hard overall deadline:
+        # terminal 4xx errors return immediately, transient failures back
+        # off without synchronizing into a thundering herd on restart.
+        # asyncio.wait_for rather than asyncio.timeout keeps the documented
+        # Python 3.9 minimum.
+        async def _submit_with_retries() -> CodeExecution:
+            nonlocal last_error, honored_retry_after
+            for attempt in range(10):
+                try:
                     # Submit code
                     if attempt > 0:
-                        print(f"Submitting to: {self.base_url}/submissions (Attempt {attempt+1})")
-                        
-                    async with session.post(
+                        logger.info("Submitting to: %s/submissions (attempt %d)", self.base_url, attempt + 1)
+
+                    # wait=true long-polls: Judge0 holds the connection
+                    # until the run finishes, so the common case is one
+                    # round-trip instead of submit + ~30 polling GETs.
+                    # The read timeout is raised for this call alone,
+                    # since no bytes arrive until the run completes.
+                    # orjson encodes the (large, base64-heavy) payload
+                    # several times faster than the stdlib json httpx
+                    # would use; content-type is already in self.headers
+                    response = await client.post(
                         f"{self.base_url}/submissions",
-                        json=submission_data,
+                        content=orjson.dumps(submission_data),
                         headers=self.headers,
-                        params={"base64_encoded": "true", "wait": "false"},
-                        ssl=False
-                    ) as response:
-                        
-                        if response.status != 201:
-                            error_text = await response.text()
-                            # If it's a 500/502/503/504, retry
-                            if response.status >= 500:
-                                last_error = f"Server Error {response.status}: {error_text}"
-                                await asyncio.sleep(1.5) # Wait longer
-                                continue
-                                
-                            return CodeExecution(
-                                status="error",
-                                stderr=f"Submission failed: {error_text}",
-                                test_passed=False,
-                                test_total=0
-                            )
-                        
-                        result = await response.json()
-                        token = result.get("token")
-                    
-                    # Poll for result (if submission succeeded)
+                        params={"base64_encoded": self._b64_param, "wait": "true"},
+                        timeout=httpx.Timeout(25.0, connect=5.0)
+                    )
+
+                    if response.status_code != 201:
+                        error_text = response.text
+                        # If it's a 500/502/503/504, retry
+                        if response.status_code >= 500:
+                            last_error = f"Server Error {response.status_code}: {error_text}"
+                            await asyncio.sleep(self._backoff(attempt))
+                            continue
+
+                        # Rate limited: honor Retry-After once (still
+                        # under the overall deadline), then give up
+                        if response.status_code == 429 and not honored_retry_after:
+                            honored_retry_after = True
+                            try:
+                                delay = float(response.headers.get("retry-after", 1))
+                            except ValueError:
+                                delay = 1.0
+                            last_error = f"Rate limited (429): {error_text}"
+                            await asyncio.sleep(min(delay, 10.0))
+                            continue
+
+                        # Other 4xx is terminal - retrying can't help
+                        return CodeExecution(
+                            status="error",
+                            stderr=f"Submission failed: {error_text}",
+                            test_passed=False,
+                            test_total=0
+                        )
+
+                    result = orjson.loads(response.content)
+                    token = result.get("token")
+                    status_id = result.get("status", {}).get("id")
+
+                    # Finished inline - parse and return without polling
+                    if status_id not in (None, 1, 2):
+                        return await self._parse_result(result)
+
+                    # Some deployments cap wait at ~20s and hand back a
+                    # queued/processing submission; fall back to polling,
+                    # starting slow since the run already outlived the
+                    # fast path
                     if token:
-                        return await self._poll_result(session, token)
-                        
-            except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError, aiohttp.ClientOSError, aiohttp.ClientPayloadError) as e:
-                print(f"Connection error to Judge0 on submit: {e}")
-                last_error = str(e)
-                await asyncio.sleep(2) # Wait 2s for server restart
+                        return await self._poll_result(client, token)
+
+                except httpx.TransportError as e:
+                    logger.warning("Connection error to Judge0 on submit: %s", e)
+                    last_error = str(e)
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                except Exception as e:
+                    return CodeExecution(
+                        status="error",
+                        stderr=f"Execution error: {str(e)}",
+                        test_passed=False,
+                        test_total=0
+                    )
+
+            # If all retries failed
+            return CodeExecution(
+                status="error",
+                stderr=f"Execution error: Failed to connect to execution server after 10 attempts (Server unstable). ({last_error})",
+                test_passed=False,
+                test_total=0
+            )
+
+        try:
+            return await asyncio.wait_for(
+                _submit_with_retries(),
+                timeout=settings.JUDGE0_TOTAL_DEADLINE_MS / 1000
+            )
+        except asyncio.TimeoutError:
+            return CodeExecution(
+                status="error",
+                stderr=f"Execution error: Gave up after {settings.JUDGE0_TOTAL_DEADLINE_MS / 1000:.0f}s deadline. ({last_error})",
+                test_passed=False,
+                test_total=0
+            )
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Exponential backoff capped at 8s, plus jitter to de-synchronize
+        concurrent retries"""
+        return min(8.0, 0.25 * (2 ** attempt)) + random.uniform(0, 0.25)
+
+    @staticmethod
+    def _poll_backoff(attempt: int, base: float) -> float:
+        """Jittered exponential poll interval capped at 2s; jitter keeps
+        concurrent pollers from ticking in lockstep"""
+        return min(2.0, base * (2 ** attempt)) * random.uniform(0.85, 1.15)
+    
+    async def _execute_batch(self, source_code: str, problem_id: str) -> Optional[CodeExecution]:
+        """
+        Run each test as its own submission via /submissions/batch.
+
+        Returns None when the batch endpoint can't be used (older Judge0,
+        persistent server errors) so the caller falls back to the
+        monolithic single-submission path.
+        """
+        client = self._client or get_judge0_client()
+
+        # Harness suffixes are pre-encoded per problem; the solution is
+        # encoded once here and reused across all test blobs
+        src_bytes = b"// Solution\n" + source_code.encode()
+        blobs = [src_bytes + tail for tail in _test_snippet_tails(problem_id)]
+        submissions = [
+            {
+                "language_id": 63,  # JavaScript (Node.js)
+                "source_code": base64.b64encode(blob).decode() if self._b64 else blob.decode(),
+                "stdin": "",
+                "expected_output": ""
+            }
+            for blob in blobs
+        ]
+
+        for attempt in range(3):
+            try:
+                if attempt > 0:
+                    logger.info("Submitting batch to: %s/submissions/batch (attempt %d)", self.base_url, attempt + 1)
+
+                response = await client.post(
+                    f"{self.base_url}/submissions/batch",
+                    content=orjson.dumps({"submissions": submissions}),
+                    headers=self.headers,
+                    params={"base64_encoded": self._b64_param}
+                )
+
+                if response.status_code not in (200, 201):
+                    if response.status_code >= 500:
+                        await asyncio.sleep(self._backoff(attempt))
+                        continue
+                    # 4xx: endpoint not supported here
+                    return None
+
+                created = orjson.loads(response.content)
+
+                tokens = ",".join(
+                    entry.get("token", "")
+                    for entry in created if isinstance(entry, dict)
+                )
+                if not tokens:
+                    return None
+
+                return await self._poll_batch_result(client, tokens, len(submissions))
+
+            except httpx.TransportError as e:
+                logger.warning("Connection error to Judge0 on batch submit: %s", e)
+                await asyncio.sleep(self._backoff(attempt))
                 continue
             except Exception as e:
-                return CodeExecution(
-                    status="error",
-                    stderr=f"Execution error: {str(e)}",
-                    test_passed=False,
-                    test_total=0
+                logger.warning("Batch submit error: %s", e)
+                return None
+
+        return None
+
+    async def _poll_batch_result(self, client: httpx.AsyncClient, tokens: str, total: int, max_attempts: int = 30) -> CodeExecution:
+        """Poll the combined batch endpoint until every submission settles"""
+
+        # Poll immediately - batch tests are small and often already done -
+        # then back off exponentially (0.25s doubling to a 2s cap)
+        for attempt in range(max_attempts):
+            if attempt:
+                await asyncio.sleep(self._poll_backoff(attempt - 1, 0.25))
+
+            try:
+                # fields= trims the poll payload to what _aggregate_batch
+                # actually reads (the default includes source_code, echoing
+                # every submission back on every tick)
+                response = await client.get(
+                    f"{self.base_url}/submissions/batch",
+                    headers=self.headers,
+                    params={
+                        "tokens": tokens,
+                        "base64_encoded": self._b64_param,
+                        "fields": "status,stdout,stderr,compile_output,time,memory"
+                    }
                 )
-                
-        # If all retries failed
+
+                if response.status_code != 200:
+                    continue
+
+                result = orjson.loads(response.content)
+
+                entries = result.get("submissions") or []
+
+                # Status 1 = In Queue, 2 = Processing
+                if any((entry or {}).get("status", {}).get("id") in (None, 1, 2) for entry in entries):
+                    continue
+
+                return await self._aggregate_batch(entries, total)
+
+            except httpx.TransportError as e:
+                logger.warning("Connection error to Judge0 (batch attempt %d): %s", attempt + 1, e)
+                continue
+            except Exception as e:
+                logger.warning("Batch polling error: %s", e)
+                continue
+
+        # Timeout
         return CodeExecution(
-            status="error",
-            stderr=f"Execution error: Failed to connect to execution server after 10 attempts (Server unstable). ({last_error})",
+            status="timeout",
+            stderr="Execution timed out after 30 seconds",
             test_passed=False,
-            test_total=0
+            test_total=total
         )
-    
-    async def _poll_result(self, session: aiohttp.ClientSession, token: str, max_attempts: int = 30) -> CodeExecution:
+
+    async def _aggregate_batch(self, entries: list, total: int) -> CodeExecution:
+        """Fold per-test submissions into one CodeExecution"""
+
+        passed = 0
+        times = []
+        memories = []
+        stdout_parts = []
+        stderr_parts = []
+        compile_parts = []
+        status = "Accepted"
+
+        for entry in entries:
+            entry = entry or {}
+            status_id = entry.get("status", {}).get("id")
+            if status_id == 3:
+                passed += 1
+            elif status == "Accepted":
+                # Surface the first failing status as the overall one
+                status = entry.get("status", {}).get("description", "Unknown")
+
+            stdout = await self._field_str_async(entry.get("stdout"))
+            stderr = await self._field_str_async(entry.get("stderr"))
+            compile_output = await self._field_str_async(entry.get("compile_output"))
+            if stdout:
+                stdout_parts.append(stdout.strip())
+            if stderr:
+                stderr_parts.append(stderr.strip())
+            if compile_output:
+                compile_parts.append(compile_output.strip())
+
+            try:
+                if entry.get("time") is not None:
+                    times.append(float(entry["time"]))
+                if entry.get("memory") is not None:
+                    memories.append(int(entry["memory"]))
+            except (TypeError, ValueError):
+                pass
+
+        # Keep the summary line the rest of the pipeline expects
+        stdout_parts.append(f"\n{passed}/{total} tests passed")
+
+        return _CODE_EXECUTION.validate_python({
+            "stdout": "\n".join(stdout_parts),
+            "stderr": "\n".join(stderr_parts) or None,
+            "compile_output": "\n".join(compile_parts) or None,
+            "status": status,
+            "time": max(times) if times else None,
+            "memory": max(memories) if memories else None,
+            "test_passed": (passed == total),
+            "test_total": total
+        })
+
+    async def _parse_result(self, result: Dict[str, Any]) -> CodeExecution:
+        """Parse a finished Judge0 submission (shared by the wait=true fast
+        path and the polling fallback)"""
+
+        status_id = result.get("status", {}).get("id")
+
+        # Parse test results from the raw bytes - the utf-8 decode happens
+        # once below, only for the returned model
+        if self._b64:
+            encoded = result.get("stdout")
+            if encoded and len(encoded) > _B64_OFFLOAD_BYTES:
+                stdout_bytes = await asyncio.to_thread(self._decode_base64_bytes, encoded)
+            else:
+                stdout_bytes = self._decode_base64_bytes(encoded)
+        else:
+            stdout_bytes = (result.get("stdout") or "").encode('utf-8', errors='replace')
+        stderr = await self._field_str_async(result.get("stderr"))
+        compile_output = await self._field_str_async(result.get("compile_output"))
+
+        test_passed = False
+        test_total = 0
+
+        m = _TESTS_RE.search(stdout_bytes)
+        if m:
+            passed = int(m.group(1))
+            total = int(m.group(2))
+            test_passed = (passed == total)
+            test_total = total
+
+        # Check exit code
+        if status_id == 3:  # Accepted
+            test_passed = True
+
+        return _CODE_EXECUTION.validate_python({
+            "stdout": stdout_bytes.decode('utf-8', errors='replace'),
+            "stderr": stderr,
+            "compile_output": compile_output,
+            "status": result.get("status", {}).get("description", "Unknown"),
+            "time": result.get("time"),
+            "memory": result.get("memory"),
+            "test_passed": test_passed and status_id == 3,
+            "test_total": test_total if test_total > 0 else 5
+        })
+
+    async def _poll_result(self, client: httpx.AsyncClient, token: str, max_attempts: int = 30) -> CodeExecution:
         """
-        Poll Judge0 for execution result
-        
+        Poll Judge0 for execution result (fallback when wait=true returns a
+        still-queued submission)
+
         Args:
-            session: aiohttp session
+            client: shared httpx client
             token: Submission token
             max_attempts: Maximum polling attempts (30 = 30 seconds)
-            
+
         Returns:
             CodeExecution model
         """
-        
-        # Adaptive polling (Backoff strategy)
-        # Start fast, then slow down to save resources
-        wait_times = [0.25, 0.25, 0.5, 0.5, 1.0, 1.0, 2.0, 2.0] # ... and then 2.0s constant
-        
+
+        # First poll goes out immediately - wait=true races the run server
+        # side, so by the time we fall back here it may have just finished.
+        # After that, back off exponentially from 0.5s to a 2s cap.
         for attempt in range(max_attempts):
-            # Determine wait time
-            wait = wait_times[attempt] if attempt < len(wait_times) else 2.0
-            await asyncio.sleep(wait)
-            
+            if attempt:
+                await asyncio.sleep(self._poll_backoff(attempt - 1, 0.5))
+
             try:
-                async with session.get(
+                response = await client.get(
                     f"{self.base_url}/submissions/{token}",
                     headers=self.headers,
-                    params={"base64_encoded": "true"},
-                    ssl=False
-                ) as response:
-                    
-                    if response.status != 200:
-                        continue
-                    
-                    result = await response.json()
-                    status_id = result.get("status", {}).get("id")
-                    
-                    # Status 1 = In Queue, 2 = Processing
-                    if status_id in [1, 2]:
-                        continue
-                    
-                    # Decode outputs
-                    stdout = self._decode_base64(result.get("stdout"))
-                    stderr = self._decode_base64(result.get("stderr"))
-                    compile_output = self._decode_base64(result.get("compile_output"))
-                    
-                    # Parse test results
-                    test_passed = False
-                    test_total = 0
-                    
-                    if stdout:
-                        # Count passed tests from output
-                        lines = stdout.split('\n')
-                        for line in lines:
-                            if '/' in line and 'tests passed' in line:
-                                parts = line.split('/')
-                                if len(parts) == 2:
-                                    try:
-                                        passed = int(parts[0].strip())
-                                        total = int(parts[1].split()[0].strip())
-                                        test_passed = (passed == total)
-                                        test_total = total
-                                    except:
-                                        pass
-                    
-                    # Check exit code
-                    if status_id == 3:  # Accepted
-                        test_passed = True
-                    
-                    return CodeExecution(
-                        stdout=stdout,
-                        stderr=stderr,
-                        compile_output=compile_output,
-                        status=result.get("status", {}).get("description", "Unknown"),
-                        time=result.get("time"),
-                        memory=result.get("memory"),
-                        test_passed=test_passed and status_id == 3,
-                        test_total=test_total if test_total > 0 else 5
-                    )
-            
-            except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) as e:
+                    params={"base64_encoded": self._b64_param}
+                )
+
+                if response.status_code != 200:
+                    continue
+
+                result = orjson.loads(response.content)
+                status_id = result.get("status", {}).get("id")
+
+                # Status 1 = In Queue, 2 = Processing
+                if status_id in [1, 2]:
+                    continue
+
+                return await self._parse_result(result)
+
+            except httpx.TransportError as e:
                 # Catch specific connection errors to retry safely
-                print(f"Connection error to Judge0 (attempt {attempt+1}): {e}")
+                logger.warning("Connection error to Judge0 (attempt %d): %s", attempt + 1, e)
                 continue
             except Exception as e:
-                print(f"Polling error: {str(e)}")
+                logger.warning("Polling error: %s", e)
                 continue
-        
+
         # Timeout
         return CodeExecution(
             status="timeout",
@@ -250,11 +706,33 @@ class Judge0Service:
             test_total=0
         )
     
+    def _field_str(self, value: Optional[str]) -> str:
+        """Response field to text, decoding base64 only when it's in use"""
+        if not self._b64:
+            return value or ""
+        return self._decode_base64(value)
+
+    async def _field_str_async(self, value: Optional[str]) -> str:
+        """Like _field_str, but large decodes run off the event loop"""
+        if self._b64 and value and len(value) > _B64_OFFLOAD_BYTES:
+            return await asyncio.to_thread(self._decode_base64, value)
+        return self._field_str(value)
+
+    def _decode_base64_bytes(self, encoded: str) -> bytes:
+        """Decode a base64 field to raw bytes (no utf-8 decode)"""
+        if not encoded:
+            return b""
+        try:
+            return base64.b64decode(encoded)
+        except binascii.Error:
+            return encoded.encode('utf-8', errors='replace')
+
     def _decode_base64(self, encoded: str) -> str:
-        """Decode base64 string"""
+        """Decode base64 string (never raises: invalid utf-8 is replaced,
+        invalid base64 is returned as-is)"""
         if not encoded:
             return ""
         try:
-            return base64.b64decode(encoded).decode('utf-8')
-        except:
+            return base64.b64decode(encoded).decode('utf-8', errors='replace')
+        except binascii.Error:
             return encoded
@@ -0,0 +1,99 @@
+"""
+Async micro-batcher for LLM chat completions
+Collects requests arriving within a short window and dispatches them
+concurrently, so N simultaneous interviews share one parallel in-flight
+window instead of issuing N isolated round trips (this is what lets
+Ollama's server-side continuous batching actually kick in)
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+# How long to wait for more requests before dispatching a batch
+BATCH_WINDOW_SECONDS = 0.02
+
+# Upper bound on requests dispatched together
+MAX_BATCH_SIZE = 32
+
+
+class LLMBatcher:
+    """
+    Shared request aggregator for non-streaming chat completions.
+
+    Callers `await batcher.submit(client, request_kwargs)`; a background
+    task drains the queue in (up to 20 ms / 32 item) windows and fires the
+    whole window with asyncio.gather, resolving each caller's Future.
+    """
+
+    def __init__(self, window_seconds: float = BATCH_WINDOW_SECONDS, max_batch_size: int = MAX_BATCH_SIZE):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Strong references to in-flight dispatch tasks (the loop only
+        # keeps weak ones, so an unreferenced task can be collected mid-run)
+        self._dispatch_tasks: set = set()
+
+    async def submit(self, client: Any, request_kwargs: Dict[str, Any]) -> Any:
+        """Queue a chat.completions.create call and await its result"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((client, request_kwargs, future))
+        return await future
+
+    def _ensure_worker(self):
+        """Lazily start the drain task on the running event loop"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain_loop())
+
+    async def _drain_loop(self):
+        """Collect requests into windows and dispatch them concurrently"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[Any, Dict[str, Any], asyncio.Future]] = [await self._queue.get()]
+
+            # Keep collecting until the window closes or the batch fills up
+            deadline = loop.time() + self.window_seconds
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Fire-and-forget: awaiting the dispatch here would block the
+            # drain loop on the slowest completion in the batch, making
+            # every later arrival wait out the prior window (head-of-line
+            # blocking). Windows overlap instead.
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, Dict[str, Any], asyncio.Future]]):
+        """Fire the whole window concurrently and resolve caller futures"""
+        results = await asyncio.gather(
+            *[client.chat.completions.create(**kwargs) for client, kwargs, _ in batch],
+            return_exceptions=True
+        )
+
+        for (_, _, future), result in zip(batch, results):
+            if future.cancelled():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# Singleton instance
+_llm_batcher: Optional[LLMBatcher] = None
+
+def get_llm_batcher() -> LLMBatcher:
+    """Get or create the LLMBatcher singleton"""
+    global _llm_batcher
+    if _llm_batcher is None:
+        _llm_batcher = LLMBatcher()
+    return _llm_batcher
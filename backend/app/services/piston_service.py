@@ -4,55 +4,42 @@ Works on Windows - no cgroups needed!
 """
 import aiohttp
 import asyncio
-from typing import Dict, Any
+import logging
+import orjson
+import re
+from typing import Dict, Any, Optional
 from app.models.session import CodeExecution
+from app.services.judge0_service import _export_name, _test_code_for_problem
 
-# Test cases for different problems
-PROBLEM_TESTS = {
-    "two-sum": """
-const { twoSum } = require('./solution.js');
-
-const testCases = [
-    { nums: [2, 7, 11, 15], target: 9, expected: [0, 1] },
-    { nums: [3, 2, 4], target: 6, expected: [1, 2] },
-    { nums: [3, 3], target: 6, expected: [0, 1] },
-    { nums: [1, 5, 3, 7, 9], target: 12, expected: [2, 4] },
-    { nums: [-1, -2, -3, -4, -5], target: -8, expected: [2, 4] }
-];
-
-let passed = 0;
-let failed = 0;
-
-testCases.forEach((test, i) => {
-    try {
-        const result = twoSum(test.nums, test.target);
-        
-        const isCorrect = (
-            result.length === 2 &&
-            test.nums[result[0]] + test.nums[result[1]] === test.target &&
-            result[0] !== result[1]
-        );
-        
-        if (isCorrect) {
-            console.log(`✓ Test ${i + 1} passed`);
-            passed++;
-        } else {
-            console.error(`✗ Test ${i + 1} failed: Expected indices where nums[i] + nums[j] = ${test.target}, got [${result}]`);
-            failed++;
-        }
-    } catch (error) {
-        console.error(`✗ Test ${i + 1} failed with error: ${error.message}`);
-        failed++;
-    }
-});
+logger = logging.getLogger(__name__)
 
-console.log(`\\n${passed}/${testCases.length} tests passed`);
+# Matches the harness summary line ("5/5 tests passed") in one C-level
+# sweep, replacing the per-line split/probe loop
+_TESTS_RE = re.compile(r'(\d+)\s*/\s*(\d+)\s+tests passed')
 
-if (failed > 0) {
-    process.exit(1);
-}
-"""
-}
+# Shared HTTP session so submissions reuse pooled keep-alive connections
+# instead of paying TCP setup on every call (mirrors the Judge0 client)
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_piston_session() -> aiohttp.ClientSession:
+    """Get or create the shared Piston HTTP session (lazy, so it binds to
+    the running event loop)"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, keepalive_timeout=75),
+            timeout=aiohttp.ClientTimeout(total=30, sock_connect=5)
+        )
+    return _session
+
+
+async def close_piston_session():
+    """Close the shared session (called from the app shutdown hook)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
 
 class PistonService:
     """Service for executing code via Piston API"""
@@ -65,9 +52,10 @@ class PistonService:
         Execute JavaScript code with test cases using Piston
         """
         
-        # Get test cases for the problem
-        test_code = PROBLEM_TESTS.get(problem_id, "")
-        
+        # Same memoized, problem-service-backed harness Judge0 uses; Piston
+        # runs two files, so the require('./solution.js') form is kept as-is
+        test_code = _test_code_for_problem(problem_id)
+
         if not test_code:
             return CodeExecution(
                 status="error",
@@ -75,9 +63,9 @@ class PistonService:
                 test_passed=False,
                 test_total=0
             )
-        
-        # Wrap source code with module.exports
-        wrapped_code = f"{source_code}\\n\\nmodule.exports = {{ twoSum }};"
+
+        # Wrap source code with module.exports so the harness can require it
+        wrapped_code = f"{source_code}\n\nmodule.exports = {{ {_export_name(problem_id)} }};"
         
         # Prepare Piston request
         payload = {
@@ -102,64 +90,59 @@ class PistonService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/api/v2/execute",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status != 200:
-                        error_text = await response.text()
-                        return CodeExecution(
-                            status="error",
-                            stderr=f"Execution failed: {error_text}",
-                            test_passed=False,
-                            test_total=0
-                        )
-                    
-                    result = await response.json()
-                    
-                    # Extract outputs
-                    stdout = result.get("run", {}).get("stdout", "")
-                    stderr = result.get("run", {}).get("stderr", "")
-                    compile_output = result.get("compile", {}).get("output", "")
-                    
-                    # Parse test results
-                    test_passed = False
-                    test_total = 5
-                    
-                    if stdout:
-                        # Count passed tests from output
-                        lines = stdout.split('\\n')
-                        for line in lines:
-                            if '/' in line and 'tests passed' in line:
-                                parts = line.split('/')
-                                if len(parts) == 2:
-                                    try:
-                                        passed = int(parts[0].strip())
-                                        total = int(parts[1].split()[0].strip())
-                                        test_passed = (passed == total)
-                                        test_total = total
-                                    except:
-                                        pass
-                    
-                    # Check exit code
-                    exit_code = result.get("run", {}).get("code", 1)
-                    if exit_code == 0:
-                        test_passed = True
-                    
+            session = get_piston_session()
+            # orjson on both sides - aiohttp's json= helpers use stdlib json
+            async with session.post(
+                f"{self.base_url}/api/v2/execute",
+                data=orjson.dumps(payload),
+                headers={"content-type": "application/json"}
+            ) as response:
+
+                if response.status != 200:
+                    error_text = await response.text()
                     return CodeExecution(
-                        stdout=stdout,
-                        stderr=stderr,
-                        compile_output=compile_output,
-                        status="Accepted" if exit_code == 0 else "Runtime Error",
-                        time=None,
-                        memory=None,
-                        test_passed=test_passed,
-                        test_total=test_total
+                        status="error",
+                        stderr=f"Execution failed: {error_text}",
+                        test_passed=False,
+                        test_total=0
                     )
-                    
+
+                result = orjson.loads(await response.read())
+
+            # Extract outputs
+            stdout = result.get("run", {}).get("stdout", "")
+            stderr = result.get("run", {}).get("stderr", "")
+            compile_output = result.get("compile", {}).get("output", "")
+
+            # Parse test results
+            test_passed = False
+            test_total = 5
+
+            if stdout:
+                m = _TESTS_RE.search(stdout)
+                if m:
+                    passed = int(m.group(1))
+                    total = int(m.group(2))
+                    test_passed = (passed == total)
+                    test_total = total
+
+            # Check exit code
+            exit_code = result.get("run", {}).get("code", 1)
+            if exit_code == 0:
+                test_passed = True
+
+            return CodeExecution(
+                stdout=stdout,
+                stderr=stderr,
+                compile_output=compile_output,
+                status="Accepted" if exit_code == 0 else "Runtime Error",
+                time=None,
+                memory=None,
+                test_passed=test_passed,
+                test_total=test_total
+            )
+
+
         except asyncio.TimeoutError:
             return CodeExecution(
                 status="timeout",
@@ -168,7 +151,7 @@ class PistonService:
                 test_total=0
             )
         except Exception as e:
-            print(f"Piston execution error: {str(e)}")
+            logger.warning("Piston execution error: %s", e)
             return CodeExecution(
                 status="error",
                 stderr=f"Execution error: {str(e)}",
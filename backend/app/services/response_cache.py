@@ -0,0 +1,74 @@
+"""
+Persistent on-disk response cache for deterministic LLM calls
+SQLite-backed, keyed by a hash of (model, temperature, messages) - repeat
+analyses of the same problem+code skip the network entirely
+"""
+import os
+import time
+import sqlite3
+import hashlib
+from typing import Optional
+
+import orjson
+
+CACHE_DIR = os.path.expanduser("~/.ai_interview")
+DB_FILE = os.path.join(CACHE_DIR, "llm.db")
+
+# Only near-deterministic calls are cached; chat at higher temperatures
+# should keep its variety
+MAX_CACHEABLE_TEMPERATURE = 0.3
+
+
+class ResponseCache:
+    """Exact-match cache of LLM completions in a local SQLite database"""
+
+    def __init__(self, db_file: str = DB_FILE):
+        os.makedirs(os.path.dirname(db_file), exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT, created_at INT)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, temperature: float, messages: list) -> str:
+        """Stable hash of everything that determines the completion"""
+        payload = orjson.dumps(
+            {"m": model, "t": temperature, "msgs": messages},
+            option=orjson.OPT_SORT_KEYS
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None on miss"""
+        try:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            print(f"ResponseCache get error: {e}")
+            return None
+
+    def set(self, key: str, response: str):
+        """Store a response (best-effort)"""
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, int(time.time()))
+            )
+            self._conn.commit()
+        except Exception as e:
+            print(f"ResponseCache set error: {e}")
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the ResponseCache singleton"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,221 @@
+"""
+Semantic response cache for the AI interviewer
+Replays cached completions when a candidate asks a near-identical question,
+skipping the network round trip and decode cost entirely
+"""
+import os
+import time
+import asyncio
+from typing import Optional, List, AsyncGenerator
+
+import numpy as np
+
+# Cosine similarity required to treat a prompt as a repeat
+SIMILARITY_THRESHOLD = 0.93
+
+# FIFO eviction kicks in above this many entries
+MAX_ENTRIES = 10_000
+
+# Size of replayed chunks when mimicking a streaming response
+REPLAY_CHUNK_CHARS = 40
+
+# Initial embedding-buffer capacity; grows by doubling so appends stay
+# amortized O(1) instead of vstack's full-matrix copy per store
+INITIAL_CAPACITY = 256
+
+# Minimum seconds between disk snapshots; writes between ticks just mark
+# the cache dirty and are picked up by the next snapshot (or the shutdown
+# flush)
+SAVE_INTERVAL_SECONDS = 60
+
+CACHE_DIR = os.path.expanduser("~/.ai_interview")
+CACHE_FILE = os.path.join(CACHE_DIR, "cache.npz")
+
+
+class SemanticCache:
+    """
+    Embedding-keyed response cache with cosine-similarity lookup.
+
+    Holds a NumPy matrix of L2-normalized prompt embeddings alongside the
+    stored completions. Lookups are a single matrix-vector product; hits
+    above SIMILARITY_THRESHOLD (with a matching problem_id) replay the
+    cached completion instead of calling the LLM.
+
+    Persistence is debounced and runs in a worker thread: the full-cache
+    np.savez grows with cache size, so it must never run inline on the
+    event loop for every store.
+    """
+
+    def __init__(self, cache_file: str = CACHE_FILE):
+        self.cache_file = cache_file
+        # Preallocated row buffer; rows [0:_count] are live
+        self._buf: Optional[np.ndarray] = None
+        self._count = 0
+        self.problem_ids: List[str] = []
+        self.responses: List[str] = []
+        self.timestamps: List[float] = []
+        self._dirty = False
+        self._last_save = 0.0
+        self._save_task: Optional[asyncio.Task] = None
+        self._load()
+
+    @property
+    def embeddings(self) -> Optional[np.ndarray]:
+        """Live (n, dim) view of the stored embeddings, or None when empty"""
+        if self._buf is None or self._count == 0:
+            return None
+        return self._buf[:self._count]
+
+    def _load(self):
+        """Load persisted cache entries from disk (best-effort)"""
+        try:
+            if os.path.exists(self.cache_file):
+                data = np.load(self.cache_file, allow_pickle=True)
+                loaded = np.asarray(data["embeddings"], dtype=np.float32)
+                self._buf = loaded.copy()
+                self._count = len(loaded)
+                self.problem_ids = list(data["problem_ids"])
+                self.responses = list(data["responses"])
+                self.timestamps = list(data["timestamps"])
+                print(f"SemanticCache: loaded {len(self.responses)} cached responses")
+        except Exception as e:
+            print(f"SemanticCache load error (starting empty): {e}")
+            self._buf = None
+            self._count = 0
+            self.problem_ids = []
+            self.responses = []
+            self.timestamps = []
+
+    def _snapshot(self):
+        """Copy the live entries so the background save never races a
+        concurrent store"""
+        emb = self.embeddings
+        return (
+            emb.copy() if emb is not None else None,
+            list(self.problem_ids),
+            list(self.responses),
+            list(self.timestamps),
+        )
+
+    @staticmethod
+    def _write_snapshot(cache_file, embeddings, problem_ids, responses, timestamps):
+        """Persist a snapshot to disk (best-effort; runs in a worker thread)"""
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            np.savez(
+                cache_file,
+                embeddings=embeddings if embeddings is not None else np.empty((0, 0), dtype=np.float32),
+                problem_ids=np.array(problem_ids, dtype=object),
+                responses=np.array(responses, dtype=object),
+                timestamps=np.array(timestamps)
+            )
+        except Exception as e:
+            print(f"SemanticCache save error: {e}")
+
+    def _maybe_schedule_save(self):
+        """Kick off a background snapshot at most once per interval; the
+        event loop only pays for the copy, not the disk write"""
+        self._dirty = True
+        if self._save_task is not None and not self._save_task.done():
+            return
+        now = time.monotonic()
+        if now - self._last_save < SAVE_INTERVAL_SECONDS:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (scripts/tests): the shutdown flush covers it
+            return
+        self._last_save = now
+        self._dirty = False
+        self._save_task = loop.create_task(
+            asyncio.to_thread(self._write_snapshot, self.cache_file, *self._snapshot())
+        )
+
+    async def flush(self):
+        """Write any unsaved entries to disk (called on app shutdown)"""
+        if self._save_task is not None and not self._save_task.done():
+            await self._save_task
+        if self._dirty:
+            self._dirty = False
+            await asyncio.to_thread(self._write_snapshot, self.cache_file, *self._snapshot())
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Convert to a unit-length float32 vector for cosine similarity"""
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def _append_row(self, vec: np.ndarray):
+        """Append one embedding row, doubling capacity when full"""
+        dim = vec.shape[0]
+        if self._buf is None or self._buf.shape[1] != dim:
+            self._buf = np.empty((INITIAL_CAPACITY, dim), dtype=np.float32)
+            self._count = 0
+        elif self._count == len(self._buf):
+            grown = np.empty((len(self._buf) * 2, dim), dtype=np.float32)
+            grown[:self._count] = self._buf[:self._count]
+            self._buf = grown
+        self._buf[self._count] = vec
+        self._count += 1
+
+    def lookup(self, embedding: List[float], problem_id: str) -> Optional[str]:
+        """
+        Find the most similar cached prompt.
+        Returns the stored completion if similarity > threshold and the
+        problem matches, otherwise None.
+        """
+        matrix = self.embeddings
+        if matrix is None or len(self.responses) == 0:
+            return None
+
+        query = self._normalize(embedding)
+        similarities = matrix @ query
+
+        # Mask out entries from other problems before taking the argmax
+        mask = np.array([pid == problem_id for pid in self.problem_ids])
+        if not mask.any():
+            return None
+        similarities = np.where(mask, similarities, -1.0)
+
+        best = int(np.argmax(similarities))
+        if similarities[best] > SIMILARITY_THRESHOLD:
+            print(f"SemanticCache HIT (sim={similarities[best]:.3f})")
+            return self.responses[best]
+        return None
+
+    def store(self, embedding: List[float], problem_id: str, response: str):
+        """Add a new (embedding, response) entry, evicting FIFO at capacity"""
+        self._append_row(self._normalize(embedding))
+        self.problem_ids.append(problem_id)
+        self.responses.append(response)
+        self.timestamps.append(time.time())
+
+        # FIFO eviction (rare: only once the cache is full)
+        if len(self.responses) > MAX_ENTRIES:
+            overflow = len(self.responses) - MAX_ENTRIES
+            self._buf = self._buf[overflow:self._count].copy()
+            self._count = len(self._buf)
+            self.problem_ids = self.problem_ids[overflow:]
+            self.responses = self.responses[overflow:]
+            self.timestamps = self.timestamps[overflow:]
+
+        self._maybe_schedule_save()
+
+    async def replay(self, response: str) -> AsyncGenerator[str, None]:
+        """Yield a cached completion in small chunks to mimic streaming"""
+        for i in range(0, len(response), REPLAY_CHUNK_CHARS):
+            yield response[i:i + REPLAY_CHUNK_CHARS]
+            await asyncio.sleep(0)
+
+
+# Singleton instance
+_semantic_cache: Optional[SemanticCache] = None
+
+def get_semantic_cache() -> SemanticCache:
+    """Get or create the SemanticCache singleton"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache()
+    return _semantic_cache
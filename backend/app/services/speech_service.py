@@ -4,12 +4,61 @@ High-quality TTS and STT using Azure Cognitive Services Speech SDK
 """
 import asyncio
 import base64
+import hashlib
 import io
-from typing import Optional, AsyncGenerator
+from collections import OrderedDict
+from typing import Optional, AsyncGenerator, Tuple
 import azure.cognitiveservices.speech as speechsdk
 from app.config import settings
 
 
+class TTSCache:
+    """
+    Bounded LRU for synthesized audio, keyed by voice + text digest.
+    Session intros and canned prompts repeat across candidates; a hit turns
+    a 200-500ms Azure round-trip into a dict lookup. The base64 form is
+    cached alongside the bytes so the JSON endpoint skips re-encoding too.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self._store: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._maxsize = maxsize
+
+    @staticmethod
+    def key(voice: str, text: str) -> str:
+        return f"{voice}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Return (audio_bytes, audio_base64), or None on miss"""
+        entry = self._store.get(key)
+        if entry is not None:
+            self._store.move_to_end(key)
+        return entry
+
+    def put(self, key: str, audio_data: bytes, audio_base64: Optional[str] = None) -> Tuple[bytes, str]:
+        """Store audio and its base64 form (precomputed by callers that
+        encode off the event loop), evicting oldest past the cap"""
+        if audio_base64 is None:
+            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
+        entry = (audio_data, audio_base64)
+        self._store[key] = entry
+        self._store.move_to_end(key)
+        while len(self._store) > self._maxsize:
+            self._store.popitem(last=False)
+        return entry
+
+
+# Singleton cache instance
+_tts_cache: Optional[TTSCache] = None
+
+def get_tts_cache() -> TTSCache:
+    """Get or create the TTS audio cache singleton"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
+
+
 class AzureSpeechService:
     """
     Azure Speech Service for Text-to-Speech and Speech-to-Text.
@@ -37,28 +86,61 @@ class AzureSpeechService:
         self.speech_config.set_speech_synthesis_output_format(
             speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
         )
-    
-    async def text_to_speech(self, text: str) -> Optional[bytes]:
+
+        # Synthesizer construction dominates TTS wall time, so instances are
+        # cached per voice. Each entry pairs the synthesizer with a lock -
+        # the SDK processes one utterance at a time per instance.
+        self._synthesizers: dict = {}
+        self._synth_guard = asyncio.Lock()
+
+    async def _get_synthesizer(self, voice: str):
+        """Get or build the cached (synthesizer, lock) pair for a voice"""
+        async with self._synth_guard:
+            entry = self._synthesizers.get(voice)
+            if entry is None:
+                if voice == self.speech_config.speech_synthesis_voice_name:
+                    config = self.speech_config
+                else:
+                    config = speechsdk.SpeechConfig(
+                        subscription=self.speech_key,
+                        region=self.speech_region
+                    )
+                    config.speech_synthesis_voice_name = voice
+                    config.set_speech_synthesis_output_format(
+                        speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
+                    )
+                entry = (
+                    speechsdk.SpeechSynthesizer(
+                        speech_config=config,
+                        audio_config=None  # No audio output, we'll get the bytes
+                    ),
+                    asyncio.Lock()
+                )
+                self._synthesizers[voice] = entry
+            return entry
+
+    def close(self):
+        """Release cached synthesizers (called on app shutdown)"""
+        self._synthesizers.clear()
+
+    async def text_to_speech(self, text: str, voice: str = "en-US-JennyNeural") -> Optional[bytes]:
         """
         Convert text to speech audio bytes.
         Returns MP3 audio data suitable for web playback.
         """
         try:
-            # Create synthesizer with audio output to memory stream
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config,
-                audio_config=None  # No audio output, we'll get the bytes
-            )
-            
+            synthesizer, lock = await self._get_synthesizer(voice)
+
             # Clean text for speech (remove markdown formatting)
             clean_text = self._clean_for_speech(text)
-            
-            # Synthesize speech
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: synthesizer.speak_text_async(clean_text).get()
-            )
-            
+
+            # Synthesize speech (serialized per synthesizer instance)
+            async with lock:
+                result = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    lambda: synthesizer.speak_text_async(clean_text).get()
+                )
+
             if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
                 return result.audio_data
             elif result.reason == speechsdk.ResultReason.Canceled:
@@ -67,7 +149,7 @@ class AzureSpeechService:
                 if cancellation.error_details:
                     print(f"TTS error: {cancellation.error_details}")
                 return None
-                
+
         except Exception as e:
             print(f"TTS error: {e}")
             return None
@@ -98,20 +180,22 @@ class AzureSpeechService:
         """
         
         try:
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config,
-                audio_config=None
+            # SSML names its voice inline, so the default synthesizer works
+            # for any voice here
+            synthesizer, lock = await self._get_synthesizer(
+                self.speech_config.speech_synthesis_voice_name
             )
-            
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: synthesizer.speak_ssml_async(ssml).get()
-            )
-            
+
+            async with lock:
+                result = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    lambda: synthesizer.speak_ssml_async(ssml).get()
+                )
+
             if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
                 return result.audio_data
             return None
-            
+
         except Exception as e:
             print(f"TTS SSML error: {e}")
             return None
@@ -170,6 +254,58 @@ class AzureSpeechService:
             print(f"STT error: {e}")
             return None
     
+    async def speech_to_text_from_stream(self, chunks) -> Optional[str]:
+        """
+        Convert an async stream of audio byte chunks to text.
+        Chunks are pushed into the recognizer as they arrive, so upload and
+        recognition overlap instead of buffering the whole clip first.
+        """
+        try:
+            stream = speechsdk.audio.PushAudioInputStream()
+            audio_config = speechsdk.audio.AudioConfig(stream=stream)
+
+            recognizer = speechsdk.SpeechRecognizer(
+                speech_config=self.speech_config,
+                audio_config=audio_config
+            )
+
+            loop = asyncio.get_event_loop()
+            done = asyncio.Event()
+            pieces = []
+
+            def on_recognized(evt):
+                if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                    pieces.append(evt.result.text)
+
+            def on_stopped(evt):
+                loop.call_soon_threadsafe(done.set)
+
+            recognizer.recognized.connect(on_recognized)
+            recognizer.session_stopped.connect(on_stopped)
+            recognizer.canceled.connect(on_stopped)
+
+            recognizer.start_continuous_recognition_async()
+            try:
+                async for chunk in chunks:
+                    if chunk:
+                        stream.write(chunk)
+            finally:
+                stream.close()
+
+            # Recognition drains the remaining audio, then fires
+            # session_stopped; cap the wait so a hung session can't leak
+            try:
+                await asyncio.wait_for(done.wait(), timeout=30)
+            finally:
+                recognizer.stop_continuous_recognition_async()
+
+            text = " ".join(pieces).strip()
+            return text or None
+
+        except Exception as e:
+            print(f"STT stream error: {e}")
+            return None
+
     def _clean_for_speech(self, text: str) -> str:
         """Remove markdown and other formatting that shouldn't be spoken"""
         import re
@@ -4,7 +4,7 @@ Handles all bidirectional events between frontend and backend
 """
 import socketio
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict
 from app.models.session import (
     InterviewSession, 
@@ -43,6 +43,11 @@ async def disconnect(sid):
     if sid in socket_to_session:
         session_id = socket_to_session[sid]
         del socket_to_session[sid]
+
+        # Release the SK agent's chat history for this session
+        from app.agents.sk_agent import SemanticKernelInterviewerAgent
+        SemanticKernelInterviewerAgent.close_session(session_id)
+
         print(f"Removed session mapping for {session_id}")
 
 @sio.event
@@ -76,7 +81,7 @@ async def join_session(sid, data):
             problem_id=problem.problem_id,
             problem_title=problem.title,
             status=SessionStatus.IN_PROGRESS,
-            started_at=datetime.utcnow(),
+            started_at=datetime.now(timezone.utc),
             current_code=problem.initial_code
         )
         
@@ -86,10 +91,9 @@ async def join_session(sid, data):
         # Add welcome message from AI interviewer
         welcome_message = ChatMessage(
             role="assistant",
-            content=welcome_content,
-            timestamp=datetime.utcnow()
+            content=welcome_content
         )
-        active_sessions[session_id].chat_history.append(welcome_message)
+        active_sessions[session_id].add_chat_message(welcome_message)
     
     # Map socket to session
     socket_to_session[sid] = session_id
@@ -133,7 +137,7 @@ async def code_update(sid, data):
     
     # Update code in session
     session.current_code = data.get('code', '')
-    session.last_code_update = datetime.utcnow()
+    session.last_code_update = datetime.now(timezone.utc)
     
     print(f"Code updated for session {session_id} (length: {len(session.current_code)})")
     
@@ -173,9 +177,8 @@ async def run_code(sid, data):
         judge0 = Judge0Service()
         result = await judge0.execute_code(code, session.problem_id)
         
-        # Store execution result
-        session.executions.append(result)
-        session.last_execution = result
+        # Store execution result (bounded; also updates last_execution)
+        session.add_execution(result)
         
         # Check for repeated errors (stuck detection)
         if result.stderr or not result.test_passed:
@@ -275,10 +278,9 @@ Keep response under 80 words. Be helpful, not condescending."""
         # Store and send AI response
         ai_message = ChatMessage(
             role="assistant",
-            content=ai_response,
-            timestamp=datetime.utcnow()
+            content=ai_response
         )
-        session.chat_history.append(ai_message)
+        session.add_chat_message(ai_message)
         
         # Emit to client with speak flag for TTS
         await sio.emit('chat_response', {
@@ -312,11 +314,15 @@ async def chat_message(sid, data):
     # Add user message to history
     user_chat = ChatMessage(
         role="user",
-        content=user_message,
-        timestamp=datetime.utcnow()
+        content=user_message
     )
-    session.chat_history.append(user_chat)
-    
+    session.add_chat_message(user_chat)
+
+    # Ack before touching the model so the frontend can show its typing
+    # indicator while we wait out the provider's first-token latency
+    await sio.emit('chat_ack', {}, room=sid)
+
+
     # Get AI response
     try:
         # SELECT AGENT STRATEGY
@@ -342,18 +348,26 @@ async def chat_message(sid, data):
             'recent_errors': session.last_error_message
         }
 
-        # Get instant response (no streaming)
+        # Stream chunks as they arrive so TTS/UI can start early; the final
+        # full chat_response below stays for clients that ignore chunks
         print(f"DEBUG: Getting AI response for: {user_message[:50]}...")
-        full_response = await agent.send_message(user_message, context)
+        if hasattr(agent, 'stream_message'):
+            parts = []
+            async for chunk in agent.stream_message(user_message, context):
+                if chunk:
+                    parts.append(chunk)
+                    await sio.emit('chat_response_chunk', {'content': chunk}, room=sid)
+            full_response = "".join(parts)
+        else:
+            full_response = await agent.send_message(user_message, context)
         print(f"DEBUG: AI response received. Length: {len(full_response)}")
         
         # Add to chat history
         assistant_chat = ChatMessage(
             role="assistant",
-            content=full_response,
-            timestamp=datetime.utcnow()
+            content=full_response
         )
-        session.chat_history.append(assistant_chat)
+        session.add_chat_message(assistant_chat)
         
         # Send complete message with voice flag
         await sio.emit('chat_response', {
@@ -390,35 +404,98 @@ async def proctoring_event(sid, data):
     # Create proctoring event
     event = ProctoringEvent(
         type=ProctoringEventType(event_type),
-        timestamp=datetime.utcnow(),
+        timestamp=datetime.now(timezone.utc),
         metadata=metadata
     )
     
-    session.proctoring_events.append(event)
+    session.add_proctoring_event(event)
     
     print(f"Proctoring event: {event_type} for session {session_id}")
 
-async def trigger_stuck_hint(sid: str, session_id: str, session: InterviewSession):
+@sio.event
+async def end_interview(sid, data):
     """
-    Trigger proactive hint when candidate is stuck
+    Wrap up the interview: generate the closing feedback and code analysis
+    Expected data: {}
     """
+    if sid not in socket_to_session:
+        return
+
+    session_id = socket_to_session[sid]
+    session = active_sessions.get(session_id)
+
+    if not session:
+        return
+
+    session.status = SessionStatus.COMPLETED
+    session.completed_at = datetime.now(timezone.utc)
+
     try:
         from app.agents.interviewer_agent import InterviewerAgent
-        
+
         agent = InterviewerAgent(session_id)
-        hint = await agent.proactive_hint({
-            'error': session.last_error_message,
-            'code': session.current_code,
-            'consecutive_errors': session.consecutive_errors
-        })
-        
+
+        # The closing hint and the final code analysis are independent LLM
+        # round trips - overlap them on the network instead of awaiting
+        # them back-to-back
+        hint, analysis = await asyncio.gather(
+            agent.proactive_hint({
+                'error': session.last_error_message,
+                'code': session.current_code,
+                'consecutive_errors': session.consecutive_errors
+            }),
+            agent.analyze_code(session.current_code, session.problem_id)
+        )
+
+        await sio.emit('interview_report', {
+            'closing_feedback': hint,
+            'analysis': analysis,
+            'completed_at': session.completed_at.isoformat()
+        }, room=sid)
+
+    except Exception as e:
+        print(f"Report generation error: {str(e)}")
+        await sio.emit('chat_error', {
+            'error': str(e)
+        }, room=sid)
+
+async def trigger_stuck_hint(sid: str, session_id: str, session: InterviewSession):
+    """
+    Trigger proactive hint when candidate is stuck
+    """
+    try:
+        # Prefer the Semantic Kernel agent's proactive path when Azure is
+        # configured: it folds the trigger signals into one prompt and
+        # rate-limits nudges per session
+        if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
+            from app.agents.sk_agent import SemanticKernelInterviewerAgent
+
+            agent = SemanticKernelInterviewerAgent(session_id)
+            hint = await agent.generate_proactive_prompt({
+                'consecutive_errors': session.consecutive_errors,
+                'recent_errors': session.last_error_message,
+                'current_code': session.current_code,
+                'problem_title': session.problem_title
+            })
+            if hint is None:
+                # Inside the cooldown window - skip this nudge
+                return
+        else:
+            from app.agents.interviewer_agent import InterviewerAgent
+
+            agent = InterviewerAgent(session_id)
+            hint = await agent.proactive_hint({
+                'error': session.last_error_message,
+                'code': session.current_code,
+                'consecutive_errors': session.consecutive_errors
+            })
+
         # Add hint to chat history
         hint_message = ChatMessage(
             role="assistant",
-            content=f"💡 **Hint:** {hint}",
-            timestamp=datetime.utcnow()
+            content=f"💡 **Hint:** {hint}"
         )
-        session.chat_history.append(hint_message)
+        session.add_chat_message(hint_message)
         session.hint_given = True
         
         # Send hint to client
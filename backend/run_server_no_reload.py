@@ -5,10 +5,27 @@ import sys
 # Ensure we can import app
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# uvicorn[standard] bundles uvloop + httptools; select them explicitly so the
+# faster event loop and HTTP parser are used rather than relying on "auto".
+# uvloop is not available on Windows, so fall back gracefully there.
+try:
+    import uvloop  # noqa: F401
+    LOOP = "uvloop"
+except ImportError:
+    LOOP = "auto"
+
 if __name__ == "__main__":
     print("Starting server without reload for stability...")
     try:
-        uvicorn.run("app.main:socket_app", host="0.0.0.0", port=8000, log_level="info", reload=False)
+        uvicorn.run(
+            "app.main:socket_app",
+            host="0.0.0.0",
+            port=8000,
+            log_level="info",
+            reload=False,
+            loop=LOOP,
+            http="httptools",
+        )
     except Exception as e:
         print(f"Server crashed: {e}")
         import traceback
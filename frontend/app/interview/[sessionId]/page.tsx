@@ -160,6 +160,11 @@ if (failed > 0) process.exit(1);`;
             ]);
         });
 
+        // Backend received the chat message and is generating a response
+        newSocket.on('chat_ack', () => {
+            setAgentState('thinking');
+        });
+
         // Chat response handler with voice support
         newSocket.on('chat_response', (message: ChatMessage & { speak?: boolean }) => {
             setChatMessages((prev) => [...prev, message]);
@@ -190,6 +195,7 @@ if (failed > 0) process.exit(1);`;
             newSocket.off('execution_started');
             newSocket.off('execution_complete');
             newSocket.off('execution_error');
+            newSocket.off('chat_ack');
             newSocket.off('chat_response');
             newSocket.off('chat_error');
         };